@@ -0,0 +1,361 @@
+"""性能基准测试
+
+生成指定规模的合成片库（含真实尺寸的海报 JPEG），测量启动、翻页、调整窗口大小、
+搜索、保存和详情页海报的耗时，结果写入 JSON 文件，便于比较不同版本。
+
+用法：
+    python benchmark.py                                   默认 1000、10000、100000 部
+    python benchmark.py --sizes 1000,5000 --posters 200 --output bench.json
+    xvfb-run -a python benchmark.py                       没有显示器的 Linux 上通过虚拟显示测量界面部分
+
+每种规模在独立的子进程和目录中运行（存储和缓存路径在导入模块时确定）。
+无法创建 Tk 窗口时只测量不依赖界面的部分，并在结果中注明。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = "1000,10000,100000"
+# 海报尺寸（宽, 高），接近常见的竖版电影海报
+POSTER_SIZES = [(600, 900), (800, 1200), (1000, 1500)]
+STARS = ["河合明日菜", "三上悠亚", "吕艳婷", "迈克尔·比恩", "道格·科克尔", "新垣结衣", "石原里美", "长泽雅美"]
+DIRECTORS = ["饺子", "丹·特拉亨伯格", "是枝裕和", "岩井俊二", "北野武"]
+WORDS = ["夏天", "海边", "回忆", "旅行", "城市", "夜晚", "雨", "少年", "音乐", "好听"]
+# 界面测量中等待后台解码完成的最长时间（秒）
+IDLE_TIMEOUT = 60
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def median_ms(samples):
+    return ms(statistics.median(samples))
+
+
+# ---------------------------------------------------------------- 数据生成
+
+def generate_posters(posters_dir, count, seed=0):
+    """生成 count 张带渐变和噪点的海报（压缩后大小接近真实海报），已存在的文件保留"""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    os.makedirs(posters_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(posters_dir, f"poster_{i:05d}.jpg")
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        width, height = POSTER_SIZES[i % len(POSTER_SIZES)]
+        color = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+        gradient = Image.linear_gradient("L").resize((width, height))
+        noise = Image.effect_noise((width, height), 40)
+        img = Image.merge("RGB", (gradient, noise, color.getchannel(rng.randrange(3))))
+        img = Image.blend(img, color, 0.4)
+        img.save(path, format="JPEG", quality=85)
+    return paths
+
+
+def link_posters(src_dir, dest_dir):
+    """把共享的海报放进每个片库的 posters 目录，优先使用硬链接"""
+    os.makedirs(dest_dir, exist_ok=True)
+    for name in os.listdir(src_dir):
+        dest = os.path.join(dest_dir, name)
+        if os.path.exists(dest):
+            continue
+        try:
+            os.link(os.path.join(src_dir, name), dest)
+        except OSError:
+            shutil.copy2(os.path.join(src_dir, name), dest)
+
+
+def synthetic_movies(count, poster_count, seed=0):
+    """生成 count 部电影，海报在 poster_count 张图片中循环使用"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "id": f"bench{i:07d}",
+            "title": f"BENCH-{i:06d} {rng.choice(WORDS)}{rng.choice(WORDS)}",
+            "poster_path": f"posters/poster_{i % poster_count:05d}.jpg",
+            "stars": ", ".join(rng.sample(STARS, 2)),
+            "director": rng.choice(DIRECTORS),
+            "level": str(rng.randint(0, 5)),
+            "type": "剧情",
+            "region": "日本",
+            "download_link": f"https://example.com/download/{i}",
+            "watch_link": f"https://example.com/watch/{i}",
+            "synopsis": "".join(rng.choice(WORDS) for _ in range(20)),
+        }
+
+
+# ---------------------------------------------------------------- 子进程：单个规模
+
+def bench_headless(args, results):
+    """不依赖界面的部分：存储读写、索引、搜索、海报解码"""
+    from storage import open_store
+    from search_index import SearchIndex
+    from poster_cache import PosterCache, GRID_SIZE, DETAIL_SIZE
+
+    store = open_store()
+    try:
+        if store.is_empty():
+            results["bulk_write_ms"] = ms(timed(store.put_many, list(synthetic_movies(args.size, args.posters))))
+
+        start = time.perf_counter()
+        records = list(store.iter_summaries())
+        results["stream_summaries_ms"] = ms(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        index = SearchIndex(records, detail_search=store.search_details)
+        results["index_build_ms"] = ms(time.perf_counter() - start)
+
+        search = {}
+        for query in args.queries:
+            samples = [timed(index.filter, records, query) for _ in range(args.repeat)]
+            search[query] = {"median_ms": median_ms(samples), "matches": len(index.filter(records, query))}
+        results["search"] = search
+
+        # 单条修改和批量修改各写入一次
+        for label, count in (("save_one_ms", 1), ("save_batch_ms", 100)):
+            changed = records[:count]
+            for record in changed:
+                record.level = str((int(record.level or 0) + 1) % 6)
+            samples = [timed(store.put_many, changed) for _ in range(args.repeat)]
+            results[label] = median_ms(samples)
+
+        start = time.perf_counter()
+        store.load_details(records[-1].id)
+        results["load_details_ms"] = ms(time.perf_counter() - start)
+    finally:
+        store.close()
+
+    # 海报：首次解码（写入磁盘缓存）与再次读取磁盘缓存
+    cache = PosterCache()
+    sample = sorted({os.path.join("posters", f"poster_{i:05d}.jpg") for i in range(min(args.posters, 50))})
+    for label, size, padded in (("grid", GRID_SIZE, True), ("detail", DETAIL_SIZE, False)):
+        cold = [timed(cache.get_tile, path, size, padded) for path in sample]
+        warm = [timed(cache.get_tile, path, size, padded) for path in sample]
+        results[f"poster_{label}_cold_ms"] = median_ms(cold)
+        results[f"poster_{label}_disk_ms"] = median_ms(warm)
+
+
+def pump_until_idle(root, app, timeout=IDLE_TIMEOUT):
+    """处理事件直到后台解码和详情查询全部完成并显示"""
+    deadline = time.perf_counter() + timeout
+    loader = app.poster_loader
+    root.update()
+    while time.perf_counter() < deadline:
+        if not loader._futures and loader._results.empty() and app._detail_future is None:
+            break
+        time.sleep(0.002)
+        root.update()
+    root.update_idletasks()
+
+
+def bench_gui(args, results):
+    """界面部分：启动、翻页、调整窗口大小、搜索、保存、详情页"""
+    import tkinter as tk
+    from tkinter import ttk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        results["skipped"] = f"无法创建 Tk 窗口（{e}），可使用 xvfb-run 运行"
+        return
+
+    from main_page import MovieLibraryApp
+
+    ttk.Style(root).theme_use("clam")
+    # 窗口需要映射后控件才有实际尺寸，因此放到屏幕之外而不是隐藏
+    root.geometry("1200x800+-4000+-4000")
+    # 测量过程中不弹出提示框
+    import main_page
+    main_page.messagebox.showinfo = lambda *a, **k: None
+
+    start = time.perf_counter()
+    app = MovieLibraryApp(root)
+    root.update_idletasks()
+    results["startup_ms"] = ms(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    app.load_posters()
+    pump_until_idle(root, app)
+    results["first_page_cold_ms"] = ms(time.perf_counter() - start)
+
+    # 继续读取剩余记录，直到全部进入目录
+    start = time.perf_counter()
+    deadline = start + IDLE_TIMEOUT * 10
+    while len(app.catalog) < args.size and time.perf_counter() < deadline:
+        root.update()
+    results["stream_remaining_ms"] = ms(time.perf_counter() - start)
+    results["movies_loaded"] = len(app.catalog)
+
+    def flip():
+        app.next_page()
+        pump_until_idle(root, app)
+        app.prev_page()
+        pump_until_idle(root, app)
+
+    flip()  # 预取相邻页面
+    results["page_flip_memory_ms"] = median_ms([timed(flip) / 2 for _ in range(args.repeat)])
+
+    def flip_from_disk():
+        app.poster_cache.clear()
+        flip()
+
+    results["page_flip_disk_ms"] = median_ms([timed(flip_from_disk) / 2 for _ in range(args.repeat)])
+
+    def resize(geometry):
+        root.geometry(geometry)
+        root.update()
+        app._delayed_load_posters()
+        pump_until_idle(root, app)
+
+    resize_samples = []
+    for geometry in ("1600x900", "900x700", "1200x800") * args.repeat:
+        resize_samples.append(timed(resize, geometry + "+-4000+-4000"))
+    results["resize_ms"] = median_ms(resize_samples)
+
+    search = {}
+    for query in args.queries:
+        def run_search():
+            app.search_entry.delete(0, tk.END)
+            app.search_entry.insert(0, query)
+            # 直接重新筛选：查询不变时 search_movies 会跳过，重复测量需要每次都执行
+            app.refresh_view()
+            pump_until_idle(root, app)
+        search[query] = median_ms([timed(run_search) for _ in range(args.repeat)])
+    results["search"] = search
+    app.search_entry.delete(0, tk.END)
+    app.search_movies()
+    pump_until_idle(root, app)
+
+    def save():
+        movie = app.movies_data[0]
+        app.catalog.update(movie["id"], level=str((int(movie["level"] or 0) + 1) % 6))
+        app.writer.put(movie)
+        app.save_movies_data()
+
+    results["save_ms"] = median_ms([timed(save) for _ in range(args.repeat)])
+
+    def open_detail(movie):
+        app.show_movie_detail(movie)
+        root.update_idletasks()
+
+    movie = app.movies_data[-1]
+    results["detail_open_cold_ms"] = ms(timed(open_detail, movie))
+    results["detail_open_warm_ms"] = ms(timed(open_detail, movie))
+
+    app.on_close()
+
+
+def run_one(args):
+    """在片库目录中运行单个规模的测量（由父进程以子进程方式调用）"""
+    from perf_trace import tracer
+
+    tracer.enabled = True
+    result = {"movies": args.size, "posters": args.posters, "backend": os.environ.get("VIDEOSTORE_BACKEND")}
+    # 两部分的阶段耗时分别统计
+    result["headless"] = {}
+    bench_headless(args, result["headless"])
+    result["headless"]["stages"] = tracer.summary()
+    tracer.reset()
+    result["gui"] = {}
+    bench_gui(args, result["gui"])
+    result["gui"]["stages"] = tracer.summary()
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+# ---------------------------------------------------------------- 父进程
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="影片库性能基准测试")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="片库规模，逗号分隔")
+    parser.add_argument("--posters", type=int, default=500, help="生成的海报数量，电影循环使用这些海报")
+    parser.add_argument("--backend", default=os.environ.get("VIDEOSTORE_BACKEND", "sqlite"),
+                        choices=("sqlite", "journal"), help="存储后端")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的重复次数（取中位数）")
+    parser.add_argument("--query", dest="queries", action="append",
+                        help="搜索条件，可多次指定（默认使用一组典型查询）")
+    parser.add_argument("--workdir", help="存放合成片库的目录（保留以便复用），默认使用临时目录")
+    parser.add_argument("--output", default="benchmark_results.json", help="结果 JSON 文件")
+    # 以下参数供子进程内部使用
+    parser.add_argument("--run-one", dest="size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.queries = args.queries or ["BENCH-0001", "河合", "level>=4", "director:饺子", "synopsis:好听", "zzzz"]
+
+    if args.size is not None:
+        run_one(args)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="videostore-bench-"))
+    shared_posters = os.path.join(workdir, "poster_src")
+    print(f"生成 {args.posters} 张海报到 {shared_posters}")
+    generate_posters(shared_posters, args.posters)
+
+    runs = []
+    for size in sizes:
+        library_dir = os.path.join(workdir, f"{args.backend}_{size}")
+        link_posters(shared_posters, os.path.join(library_dir, "posters"))
+        # 每次都从冷的海报缓存开始
+        shutil.rmtree(os.path.join(library_dir, "posters", ".thumbs"), ignore_errors=True)
+        result_file = os.path.join(library_dir, "result.json")
+        command = [sys.executable, os.path.abspath(__file__), "--run-one", str(size), "--result", result_file,
+                   "--posters", str(args.posters), "--repeat", str(args.repeat)]
+        for query in args.queries:
+            command += ["--query", query]
+
+        print(f"测量 {size} 部电影...")
+        env = dict(os.environ, VIDEOSTORE_BACKEND=args.backend)
+        env.pop("VIDEOSTORE_TRACE", None)
+        proc = subprocess.run(command, cwd=library_dir, env=env)
+        if proc.returncode != 0:
+            runs.append({"movies": size, "error": f"子进程退出码 {proc.returncode}"})
+            continue
+        with open(result_file, "r", encoding="utf-8") as f:
+            run = json.load(f)
+        runs.append(run)
+        gui = run["gui"]
+        print(f"  启动 {gui.get('startup_ms', '-')} ms，首屏 {gui.get('first_page_cold_ms', '-')} ms，"
+              f"翻页 {gui.get('page_flip_memory_ms', '-')} ms，保存 {run['headless']['save_one_ms']} ms"
+              + (f"（{gui['skipped']}）" if "skipped" in gui else ""))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": args.backend,
+            "posters": args.posters,
+            "repeat": args.repeat,
+            "workdir": workdir,
+        },
+        "runs": runs,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+    return 1 if any("error" in run for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
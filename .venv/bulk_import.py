@@ -0,0 +1,295 @@
+import os
+import re
+import csv
+import json
+import hashlib
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image
+from poster_cache import PosterCache, THUMB_DIR
+from search_index import normalize
+from storage import new_movie_id, atomic_write_text
+
+# 可导入的图片格式
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+# 导入后海报的最长边，超出时等比缩小
+MAX_POSTER_SIZE = 1600
+# 海报统一保存目录
+POSTERS_DIR = "posters"
+# 海报内容哈希索引，避免每次导入都重新读取所有已有海报
+HASH_INDEX_FILE = os.path.join(POSTERS_DIR, ".hash_index.json")
+# 清单中可识别的电影字段
+MANIFEST_FIELDS = ("title", "stars", "director", "type", "region", "level",
+                   "download_link", "watch_link", "synopsis")
+
+
+def title_key(title):
+    """标题去重用的哈希键：规范化后忽略空白"""
+    return hashlib.sha1(re.sub(r"\s+", "", normalize(title)).encode("utf-8")).hexdigest()
+
+
+def valid_level(level):
+    """评分只能为空或有限的数字（界面按 int(float(level)) 显示星级）"""
+    if not level:
+        return True
+    try:
+        return math.isfinite(float(level))
+    except ValueError:
+        return False
+
+
+def file_digest(path):
+    """图片内容哈希，用于发现同一张图片被重复导入"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def safe_filename(title):
+    return re.sub(r'[\\/:*?"<>|]', "_", title).strip() or "untitled"
+
+
+def ingest_poster(src_path, dest_path, max_size=MAX_POSTER_SIZE, cache_dir=THUMB_DIR):
+    """在子进程中执行：规范化并重新编码海报，同时生成各级预渲染海报"""
+    with Image.open(src_path) as img:
+        img.draft("RGB", (max_size, max_size))
+        img = img.convert("RGB")
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        img.save(tmp_path, format="JPEG", quality=90, optimize=True)
+        os.replace(tmp_path, dest_path)
+
+    PosterCache(cache_dir).build_pyramid(dest_path)
+    return dest_path
+
+
+def read_manifest(path):
+    """读取 CSV 或 JSONL 清单，poster 列的相对路径以清单所在目录为基准"""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for row in rows:
+        item = {field: str(row.get(field) or "").strip() for field in MANIFEST_FIELDS}
+        poster = str(row.get("poster") or "").strip()
+        item["source"] = os.path.join(base_dir, poster) if poster else ""
+        items.append(item)
+    return items
+
+
+def scan_images(images_dir):
+    """扫描图片目录，返回 {文件名(不含扩展名): 路径}"""
+    images = {}
+    for name in sorted(os.listdir(images_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in IMAGE_EXTENSIONS:
+            images[stem] = os.path.join(images_dir, name)
+    return images
+
+
+class PosterHashIndex:
+    """已有海报的内容哈希索引：按修改时间和大小判断是否需要重新计算"""
+
+    def __init__(self, path=HASH_INDEX_FILE):
+        self.path = path
+        self.entries = {}  # 海报路径 -> [mtime_ns, size, 内容哈希]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def refresh(self, poster_paths):
+        """同步索引与片库中的海报，只对新的或修改过的文件计算哈希"""
+        entries = {}
+        for path in poster_paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = self.entries.get(path)
+            if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                entries[path] = old
+            else:
+                entries[path] = [st.st_mtime_ns, st.st_size, file_digest(path)]
+        self.entries = entries
+
+    def digests(self):
+        return {entry[2] for entry in self.entries.values()}
+
+    def record(self, poster_path, digest):
+        """记录导入后的海报；保存的是原图的哈希，便于再次导入同一原图时识别"""
+        st = os.stat(poster_path)
+        self.entries[poster_path] = [st.st_mtime_ns, st.st_size, digest]
+
+    def save(self):
+        try:
+            atomic_write_text(self.path, json.dumps(self.entries, ensure_ascii=False))
+        except OSError as e:
+            print(f"保存海报哈希索引失败: {e}")
+
+
+class ImportResult:
+    def __init__(self):
+        self.movies = []  # 待写入的新电影
+        self.skipped = []  # (标题, 原因)
+        self.failed = []  # (标题, 错误)
+
+    def summary(self):
+        return f"新增 {len(self.movies)} 部，跳过 {len(self.skipped)} 部，失败 {len(self.failed)} 部"
+
+
+class BulkImporter:
+    """批量导入：收集条目、按哈希去重、进程池并行处理海报，最后一次性交给调用方写入"""
+
+    def __init__(self, existing_titles=(), existing_posters=(), posters_dir=POSTERS_DIR, max_workers=None,
+                 cache_dir=THUMB_DIR):
+        self.posters_dir = posters_dir
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.title_index = {title_key(title) for title in existing_titles}
+        self.hash_index = PosterHashIndex(os.path.join(posters_dir, os.path.basename(HASH_INDEX_FILE)))
+        self.existing_posters = existing_posters
+        # 已被占用的海报路径（包括片库中引用但文件已不存在的路径），新海报不会覆盖它们
+        self.taken_posters = {self._path_key(path) for path in existing_posters if path}
+        self.cancelled = False
+
+    @staticmethod
+    def _path_key(path):
+        # 按不区分大小写的绝对路径比较，Windows/macOS 上 A.jpg 与 a.jpg 是同一个文件
+        return os.path.abspath(path).casefold()
+
+    def _poster_path(self, title, digest):
+        """为新海报分配不与现有文件、片库记录及本次导入冲突的路径
+
+        改名后的电影仍引用旧文件名，不同标题也可能得到相同的安全文件名（A:B 与 A?B），
+        冲突时在文件名后加上内容哈希前缀，仍冲突再加序号。
+        """
+        base = safe_filename(title)
+        names = itertools.chain([base, f"{base}_{digest[:8]}"],
+                                (f"{base}_{digest[:8]}_{n}" for n in itertools.count(2)))
+        for name in names:
+            path = f"{self.posters_dir}/{name}.jpg"
+            key = self._path_key(path)
+            if key not in self.taken_posters and not os.path.exists(path):
+                self.taken_posters.add(key)
+                return path
+
+    def collect(self, images_dir=None, manifest=None):
+        """合并清单与图片目录：清单条目缺少海报时按标题匹配目录中的图片，
+        目录中未出现在清单里的图片以文件名作为标题导入"""
+        images = scan_images(images_dir) if images_dir else {}
+        items = read_manifest(manifest) if manifest else []
+
+        listed = set()
+        for item in items:
+            listed.add(item["title"])
+            if not item["source"] and item["title"] in images:
+                item["source"] = images[item["title"]]
+
+        for stem, path in images.items():
+            if stem not in listed:
+                item = {field: "" for field in MANIFEST_FIELDS}
+                item.update(title=stem, source=path)
+                items.append(item)
+        return items
+
+    def run(self, items, progress=None):
+        """处理所有条目，progress(已完成, 总数) 用于报告进度，返回 ImportResult"""
+        result = ImportResult()
+        os.makedirs(self.posters_dir, exist_ok=True)
+
+        # 先在主进程中去重，只把需要处理的海报交给进程池
+        pending = []
+        self.hash_index.refresh(self.existing_posters)
+        existing_images = self.hash_index.digests()
+        seen_images = set()
+        for item in items:
+            title = item["title"]
+            if not title:
+                result.skipped.append(("", "缺少标题"))
+                continue
+            key = title_key(title)
+            if key in self.title_index:
+                result.skipped.append((title, "标题已存在"))
+                continue
+            if not valid_level(item["level"]):
+                result.failed.append((title, f"评分不是数字: {item['level']}"))
+                continue
+
+            if item["source"]:
+                try:
+                    digest = file_digest(item["source"])
+                except OSError as e:
+                    result.failed.append((title, str(e)))
+                    continue
+                if digest in existing_images:
+                    result.skipped.append((title, "海报已存在于片库中"))
+                    continue
+                if digest in seen_images:
+                    result.skipped.append((title, "海报与本次导入的其他影片重复"))
+                    continue
+                seen_images.add(digest)
+                item["digest"] = digest
+
+            self.title_index.add(key)
+            pending.append(item)
+
+        total = len(pending)
+        done = 0
+        if progress:
+            progress(done, total)
+
+        movies = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            for index, item in enumerate(pending):
+                movie = {field: item[field] for field in MANIFEST_FIELDS}
+                movie["id"] = new_movie_id()
+                movie["poster_path"] = ""  # 没有海报时显示默认海报
+                if item["source"]:
+                    movie["poster_path"] = self._poster_path(item["title"], item["digest"])
+                    future = executor.submit(ingest_poster, item["source"], movie["poster_path"],
+                                             MAX_POSTER_SIZE, self.cache_dir)
+                    futures[future] = (index, movie)
+                else:
+                    movies[index] = movie
+                    done += 1
+
+            for future in as_completed(futures):
+                if self.cancelled:
+                    # 取消尚未开始的任务，已完成的海报仍然导入
+                    for other in futures:
+                        other.cancel()
+                    break
+                index, movie = futures[future]
+                error = future.exception()
+                if error is not None:
+                    result.failed.append((movie["title"], str(error)))
+                else:
+                    movies[index] = movie
+                done += 1
+                if progress:
+                    progress(done, total)
+
+        for future, (index, movie) in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                movies.setdefault(index, movie)
+
+        # 保持清单中的顺序
+        result.movies = [movies[index] for index in sorted(movies)]
+        for index in sorted(movies):
+            if pending[index]["source"]:
+                self.hash_index.record(movies[index]["poster_path"], pending[index]["digest"])
+        self.hash_index.save()
+        return result
+
+    def cancel(self):
+        self.cancelled = True
@@ -0,0 +1,75 @@
+class Catalog:
+    """电影目录：按 id 保存记录，并维护显示顺序
+
+    查找、更新、删除均按 id 在字典中完成（O(1)）；按顺序排列的列表只在增删后
+    首次访问时重建一次。界面通过 subscribe 订阅变更事件，回调参数为
+    (event, records)，event 为 "add"、"update" 或 "delete"。
+    """
+
+    def __init__(self, records=()):
+        self._records = {}  # id -> 记录，字典本身保持添加顺序
+        self._ordered = None  # 按顺序排列的记录列表缓存
+        self._listeners = []
+        for record in records:
+            self._records[record["id"]] = record
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, movie_id):
+        return movie_id in self._records
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def get(self, movie_id):
+        return self._records.get(movie_id)
+
+    def ordered(self):
+        """按添加顺序排列的记录列表（只读，增删后会重建为新的列表）"""
+        if self._ordered is None:
+            self._ordered = list(self._records.values())
+        return self._ordered
+
+    def subscribe(self, callback):
+        """订阅变更事件，返回取消订阅的函数"""
+        self._listeners.append(callback)
+        return lambda: self._listeners.remove(callback) if callback in self._listeners else None
+
+    def _notify(self, event, records):
+        for callback in list(self._listeners):
+            try:
+                callback(event, records)
+            except Exception as e:
+                print(f"处理目录变更事件失败: {e}")
+
+    def extend(self, records):
+        """批量添加记录，只发出一次事件"""
+        records = [r for r in records if r["id"] not in self._records]
+        if not records:
+            return []
+        for record in records:
+            self._records[record["id"]] = record
+        self._ordered = None
+        self._notify("add", records)
+        return records
+
+    def add(self, record):
+        return self.extend([record])
+
+    def update(self, movie_id, **changes):
+        """原地修改记录的字段，返回修改后的记录"""
+        record = self._records[movie_id]
+        for key, value in changes.items():
+            record[key] = value
+        self._notify("update", [record])
+        return record
+
+    def delete(self, movie_id):
+        """删除记录，返回被删除的记录（不存在时返回 None）"""
+        record = self._records.pop(movie_id, None)
+        if record is None:
+            return None
+        self._ordered = None
+        self._notify("delete", [record])
+        return record
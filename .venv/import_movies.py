@@ -0,0 +1,51 @@
+"""批量导入影片（无界面）
+
+用法：
+    python import_movies.py --images 海报目录
+    python import_movies.py --manifest movies.csv [--images 海报目录] [--workers 4]
+"""
+import argparse
+import sys
+from bulk_import import BulkImporter
+from storage import open_store, STORAGE_BACKEND
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量导入影片和海报")
+    parser.add_argument("--images", help="海报图片目录，文件名作为标题")
+    parser.add_argument("--manifest", help="CSV 或 JSONL 清单文件")
+    parser.add_argument("--workers", type=int, default=None, help="处理海报的进程数")
+    parser.add_argument("--backend", default=STORAGE_BACKEND, choices=("sqlite", "journal"), help="存储后端")
+    args = parser.parse_args(argv)
+
+    if not args.images and not args.manifest:
+        parser.error("至少需要指定 --images 或 --manifest")
+
+    store = open_store(args.backend)
+    try:
+        existing = list(store.iter_summaries())
+        importer = BulkImporter(existing_titles=[m.title for m in existing],
+                                existing_posters=[m.poster_path for m in existing],
+                                max_workers=args.workers)
+        items = importer.collect(args.images, args.manifest)
+
+        def progress(done, total):
+            print(f"\r正在处理海报 {done}/{total}", end="", flush=True)
+
+        result = importer.run(items, progress=progress)
+        print()
+
+        # 所有新记录一次性写入
+        if result.movies:
+            store.put_many(result.movies)
+    finally:
+        store.close()
+
+    for title, reason in result.skipped + result.failed:
+        print(f"未导入《{title}》: {reason}")
+    print(f"批量导入完成：{result.summary()}")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
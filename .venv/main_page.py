@@ -0,0 +1,758 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from PIL import Image, ImageTk
+import os
+import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from movie_detail import MovieDetailWindow
+from movie_add import AddMovieWindow
+from movie_edit import EditMovieWindow
+from movie_import import BulkImportWindow
+from poster_cache import PosterCache, GRID_SIZE
+from poster_loader import PosterLoader
+from poster_grid import PosterGrid, CELL_WIDTH, CELL_HEIGHT
+from search_index import SearchIndex, normalize
+from storage import open_store, ensure_id, BatchWriter
+from movie_record import MovieRecord
+from catalog import Catalog
+from perf_trace import tracer
+from perf_window import PerfSummaryWindow
+
+# 默认海报路径
+DEFAULT_POSTER = os.path.abspath("posters/default.png")  # 使用绝对路径
+# 启动时同步读取的记录数（足够显示首屏），其余记录分批在后续事件循环中读取
+FIRST_BATCH = 200
+# 后续每次读取的记录数：建立 n-gram 索引约 50 微秒/条，小批次便于按时间预算及时停下
+STREAM_BATCH = 50
+# 每次事件循环中读取剩余记录的时间预算（秒），超出后让出主线程
+STREAM_BUDGET = 0.012
+# 主线程轮询后台详情查询结果的间隔（毫秒）
+DETAIL_POLL_INTERVAL = 20
+
+
+class MovieLibraryApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("影片库")
+        self.root.geometry("1200x800")
+        self.root.configure(bg="#1E1E1E")
+        self.root.minsize(800, 900)  # 进一步增加最小高度
+
+        # 创建海报目录
+        os.makedirs("posters", exist_ok=True)
+
+        # 检查默认海报是否存在，不存在则创建
+        if not os.path.exists(DEFAULT_POSTER):
+            try:
+                img = Image.new('RGB', (120, 180), color=(50, 50, 50))
+                img.save(DEFAULT_POSTER)
+            except Exception as e:
+                print(f"无法创建默认海报: {e}")
+
+        # 加载星星图片
+        self.use_image_stars = self.load_star_images()
+
+        # 海报缩略图缓存（内存 LRU + 磁盘）
+        self.poster_cache = PosterCache()
+        # 后台解码线程池，解码结果通过 root.after 交回主线程
+        self.poster_loader = PosterLoader(self.root, self.poster_cache)
+
+        # 打开存储后端（首次启动时自动从 movies.json 迁移）
+        self.store = open_store()
+        # 修改先记录下来，短时间内的多次修改合并为一次写入
+        self.writer = BatchWriter(self.root, self.store, on_error=self.show_save_error)
+
+        # 启动时只读取摘要字段（标题、海报、主演、评分），详情在打开详情页时才读取
+        self._summary_stream = self.store.iter_summaries()
+        self.summaries_loaded = False  # 所有记录是否都已读入目录
+        self._streaming = False  # 正在把一批记录加入目录
+        # 电影目录：按 id 保存记录，界面通过订阅变更事件刷新
+        with tracer.stage("storage_read"):
+            self.catalog = Catalog(itertools.islice(self._summary_stream, FIRST_BATCH))
+        if self.store.first_run:
+            # 首次启动且没有旧数据时，写入示例电影（之后删光电影也不会再出现）
+            default_movies = [
+                {
+                    "title": "铁血战士：杀戮之王",
+                    "poster_path": "posters/predator.jpg",
+                    "stars": "迈克尔·比恩, 道格·科克尔",
+                    "director": "丹·特拉亨伯格",
+                    "type": "首推",
+                    "region": "美国",
+                    "level": "7.1",
+                    "download_link": "",
+                    "watch_link": ""
+                },
+                {
+                    "title": "哪吒之魔童闹海",
+                    "poster_path": "posters/nezha.jpg",
+                    "stars": "吕艳婷, 囧森瑟夫",
+                    "director": "饺子",
+                    "type": "动画",
+                    "region": "中国",
+                    "level": "8.6",
+                    "download_link": "",
+                    "watch_link": ""
+                }
+            ]
+            for movie in default_movies:
+                ensure_id(movie)
+                self.catalog.add(MovieRecord.from_dict(movie, loader=self.store.load_details))
+                self.writer.put(movie)
+
+        # 搜索索引随记录分批建立，之后随目录变更事件增量更新；剧情简介等详情字段交给存储查询
+        self.search_index = SearchIndex(self.catalog, detail_search=self.search_details)
+        # 当前显示的电影列表：无搜索条件时就是目录的有序列表本身
+        self.visible_movies = self.catalog.ordered()
+        self._search_job = None  # 输入防抖定时器
+        self._last_query = ""  # 上次筛选使用的查询（规范化后），方向键等不改变内容的按键不再重新搜索
+        # 剧情简介等详情字段需要扫描整个存储，在后台线程中查询，结果缓存在搜索索引中
+        self._detail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detail-search")
+        self._detail_future = None  # 正在进行的详情查询
+        self._detail_keep_page = True  # 查询完成后重新筛选时是否保持当前页
+
+        # 分页相关变量
+        self.current_page = 1
+        self.movies_per_page = 0  # 动态计算
+        self.posters_frame_width = 0  # 海报区域宽度
+        self._load_pending = False  # 防止重复加载
+        self.grid_cols = 1  # 当前每行显示的海报数量
+        self.scroll_offset = 0  # 连续滚动模式下的像素偏移
+
+        # 创建 Notebook 用于管理标签页
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
+        # 主页面框架
+        self.main_frame = ttk.Frame(self.notebook, style="PostersFrame.TFrame")
+        self.notebook.add(self.main_frame, text="主页面")
+
+        # 界面组件
+        self.create_ui()
+
+        # 目录变更时维护搜索索引和显示列表
+        self.catalog.subscribe(self.on_catalog_change)
+
+        # 绑定窗口大小变化事件
+        self.root.bind("<Configure>", self.on_window_resize)
+
+        # 关闭窗口时停止后台解码
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # 窗口首次显示后加载海报，随后继续读取剩余记录
+        self.root.after(100, self.load_posters)
+        self.root.after(150, self.load_remaining_movies)
+
+    @property
+    def movies_data(self):
+        """按顺序排列的全部电影（只读列表）"""
+        return self.catalog.ordered()
+
+    def on_catalog_change(self, event, records):
+        """目录变更：增量维护搜索索引，增删时更新显示列表（单个卡片的重绘由海报墙负责）"""
+        for record in records:
+            if event == "delete":
+                self.search_index.remove(record)
+            else:
+                self.search_index.update(record)
+
+        # 分批读取期间由 load_remaining_movies 每次统一刷新一次显示列表；
+        # 需要查询存储时不在这里同步查询，由随后的 refresh_view 在后台查询
+        if (event != "update" and not self._streaming
+                and not self.search_index.pending_details(self.search_entry.get())):
+            self.visible_movies = self.search_index.filter(self.catalog.ordered(), self.search_entry.get())
+
+    def load_remaining_movies(self):
+        """分批读取剩余的电影摘要，每次只占用主线程 STREAM_BUDGET，避免阻塞界面"""
+        deadline = time.perf_counter() + STREAM_BUDGET
+        while True:
+            with tracer.stage("storage_read"):
+                batch = list(itertools.islice(self._summary_stream, STREAM_BATCH))
+            if not batch:
+                self._summary_stream = iter(())
+                self.summaries_loaded = True
+                break
+
+            # 已存在的 id（例如刚添加的电影）会被目录忽略
+            self._streaming = True
+            try:
+                self.catalog.extend(batch)
+            finally:
+                self._streaming = False
+            if time.perf_counter() >= deadline:
+                break
+
+        query = self.search_entry.get()
+        if not query.strip():
+            self.visible_movies = self.catalog.ordered()
+        elif self.summaries_loaded:
+            # 有搜索条件时（可能需要查询存储中的详情字段）只在读取完成后重新筛选一次，
+            # 并刷新当前页，显示后续批次中匹配的电影
+            self.refresh_view(keep_page=True)
+        if self.summaries_loaded:
+            return
+
+        # 只更新分页信息或滚动条，当前显示的海报不变
+        if self.continuous_scroll.get():
+            self.scroll_to(self.scroll_offset)
+        elif self.movies_per_page > 0:
+            self.update_pagination(max(1, (len(self.visible_movies) + self.movies_per_page - 1)
+                                       // self.movies_per_page))
+        self.root.after(1, self.load_remaining_movies)
+
+    def search_details(self, field, term):
+        """在存储中查询详情字段，先写入尚未保存的修改"""
+        self.save_movies_data()
+        return self.store.search_details(field, term)
+
+    def start_detail_search(self, pending, keep_page):
+        """在后台查询 pending 中的详情字段，完成后按最新的搜索条件重新筛选"""
+        self._detail_keep_page = self._detail_keep_page and keep_page
+        if self._detail_future is not None:
+            # 正在查询：完成后会再次筛选，届时仍缺少的查询词再另行查询
+            return
+        self._detail_keep_page = keep_page
+        # 先写入尚未保存的修改，查询结果才包含它们
+        self.save_movies_data()
+        version = self.search_index.detail_version
+        self._detail_future = self._detail_executor.submit(self._run_detail_search, pending)
+        self.root.after(DETAIL_POLL_INTERVAL, self._poll_detail_search, pending, version)
+
+    def _run_detail_search(self, pending):
+        """在后台线程中执行"""
+        with tracer.stage("detail_search"):
+            return [self.store.search_details(field, term) for field, term in pending]
+
+    def _poll_detail_search(self, pending, version):
+        future = self._detail_future
+        if not future.done():
+            self.root.after(DETAIL_POLL_INTERVAL, self._poll_detail_search, pending, version)
+            return
+        self._detail_future = None
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"查询详情字段失败: {e}")
+            return
+        # 查询期间记录有变化时结果会被丢弃，refresh_view 随即重新查询
+        for (field, term), keys in zip(pending, results):
+            self.search_index.store_details(field, term, keys, version)
+        self.refresh_view(keep_page=self._detail_keep_page)
+
+    def on_close(self):
+        """关闭窗口前取消所有后台解码任务，并写入尚未保存的修改"""
+        self.poster_loader.shutdown()
+        # 等待正在进行的详情查询结束，之后才能压缩日志、关闭存储
+        self._detail_executor.shutdown(wait=True)
+        self.save_movies_data()
+        self.store.close()
+        self.root.destroy()
+
+    def load_star_images(self):
+        """加载星星图片，如果加载失败则使用文本替代"""
+        try:
+            STAR_EMPTY_PATH = os.path.join("posters", "star_empty.png")
+            STAR_FILLED_PATH = os.path.join("posters", "star_filled.png")
+
+            if os.path.exists(STAR_EMPTY_PATH) and os.path.exists(STAR_FILLED_PATH):
+                self.STAR_EMPTY = ImageTk.PhotoImage(Image.open(STAR_EMPTY_PATH).resize((20, 20)))
+                self.STAR_FILLED = ImageTk.PhotoImage(Image.open(STAR_FILLED_PATH).resize((20, 20)))
+                return True
+            else:
+                return False
+        except Exception as e:
+            print(f"加载星星图片失败: {e}")
+            return False
+
+    def create_ui(self):
+        # 菜单栏 - 调试工具
+        menubar = tk.Menu(self.root)
+        debug_menu = tk.Menu(menubar, tearoff=0)
+        self.trace_enabled = tk.BooleanVar(value=tracer.enabled)
+        debug_menu.add_checkbutton(label="记录耗时", variable=self.trace_enabled, command=self.toggle_trace)
+        debug_menu.add_command(label="耗时统计", command=self.show_perf_window)
+        menubar.add_cascade(label="调试", menu=debug_menu)
+        self.root.config(menu=menubar)
+
+        # 顶部操作栏 - 添加影片按钮和搜索框
+        top_bar = ttk.Frame(self.main_frame, style="SearchFrame.TFrame")
+        top_bar.pack(pady=10, fill=tk.X, padx=20)
+
+        # 添加影片按钮
+        add_movie_btn = ttk.Button(top_bar, text="添加影片", command=self.show_add_movie_window)
+        add_movie_btn.pack(side=tk.RIGHT, padx=5)
+
+        # 批量导入按钮
+        import_btn = ttk.Button(top_bar, text="批量导入", command=self.show_bulk_import_window)
+        import_btn.pack(side=tk.RIGHT, padx=5)
+
+        # 连续滚动开关，关闭时按页显示
+        self.continuous_scroll = tk.BooleanVar(value=False)
+        scroll_toggle = ttk.Checkbutton(top_bar, text="连续滚动", variable=self.continuous_scroll,
+                                        command=self.toggle_scroll_mode)
+        scroll_toggle.pack(side=tk.RIGHT, padx=5)
+
+        # 搜索栏
+        search_frame = ttk.Frame(top_bar, style="SearchFrame.TFrame")
+        search_frame.pack(side=tk.RIGHT, padx=5)
+
+        self.search_entry = ttk.Entry(search_frame, width=40)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        # 输入时自动搜索，回车立即搜索
+        self.search_entry.bind("<KeyRelease>", self.on_search_input)
+        self.search_entry.bind("<Return>", lambda event: self.search_movies())
+
+        self.search_btn = ttk.Button(search_frame, text="搜索", command=self.search_movies)
+        self.search_btn.pack(side=tk.LEFT, padx=5)
+
+        # 海报墙框架 - 使用Canvas实现滚动
+        self.canvas_frame = ttk.Frame(self.main_frame, style="PostersFrame.TFrame")
+        self.canvas_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(10, 0))
+
+        # 创建Canvas和垂直滚动条
+        self.canvas = tk.Canvas(self.canvas_frame, bg="#1E1E1E", highlightthickness=0)
+
+        # 修改：隐藏滚动条但保留功能
+        self.scrollbar = ttk.Scrollbar(self.canvas_frame, orient="vertical", command=self.on_scrollbar)
+
+        # 隐藏滚动条
+        # self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # 创建海报内容框架
+        self.posters_frame = ttk.Frame(self.canvas, style="PostersFrame.TFrame")
+        self.posters_window = self.canvas.create_window((0, 0), window=self.posters_frame, anchor="nw")
+
+        # 海报墙卡片池，翻页和滚动时复用控件
+        self.poster_grid = PosterGrid(self, self.posters_frame)
+
+        # 绑定事件处理滚动和调整大小
+        self.posters_frame.bind("<Configure>", self.on_posters_frame_configure)
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+
+        # 绑定鼠标滚轮事件
+        self.canvas.bind_all("<MouseWheel>", self.on_mousewheel)
+
+        # 底部导航栏 - 分页控制
+        self.bottom_nav = ttk.Frame(self.main_frame, style="SearchFrame.TFrame")
+        self.bottom_nav.pack(fill=tk.X, padx=20, pady=30)  # 进一步增加底部边距
+
+        # 上一页按钮
+        self.prev_btn = ttk.Button(self.bottom_nav, text="上一页", command=self.prev_page)
+        self.prev_btn.pack(side=tk.LEFT, padx=5)
+
+        # 页码标签
+        self.page_label = ttk.Label(self.bottom_nav, text="第 1 页", style="TitleLabel.TLabel")
+        self.page_label.pack(side=tk.LEFT, padx=20)
+
+        # 下一页按钮
+        self.next_btn = ttk.Button(self.bottom_nav, text="下一页", command=self.next_page)
+        self.next_btn.pack(side=tk.LEFT, padx=5)
+
+    def on_window_resize(self, event):
+        """窗口大小变化时重新计算每行显示的海报数量并刷新"""
+        # 防止重复调用
+        if event and event.widget == self.root:
+            # 延迟执行，避免频繁刷新
+            self.root.after(100, self._delayed_load_posters)
+
+    def on_canvas_configure(self, event):
+        """当Canvas大小变化时，调整内部窗口宽度"""
+        # 仅在宽度变化时调整
+        if hasattr(self, 'posters_window'):
+            self.canvas.itemconfig(self.posters_window, width=event.width)
+
+            # 延迟执行，避免频繁刷新
+            self.root.after(100, self._delayed_load_posters)
+
+    def _delayed_load_posters(self):
+        """延迟加载海报，避免频繁调用"""
+        # 防止在窗口调整过程中多次调用
+        if not hasattr(self, '_load_pending') or not self._load_pending:
+            self._load_pending = True
+            self.calculate_movies_per_page()
+            self.load_posters()
+            self._load_pending = False
+
+    def calculate_movies_per_page(self):
+        """计算每页可显示的电影数量，固定为3行"""
+        # 获取Canvas实际宽度
+        canvas_width = self.canvas.winfo_width()
+        if canvas_width <= 0:
+            canvas_width = 1000  # 默认宽度，防止计算错误
+
+        # 计算每行可显示的海报数量（海报宽度180 + 左右边距各5）
+        self.grid_cols = max(1, canvas_width // CELL_WIDTH)  # 至少显示1列
+
+        # 固定行数为3
+        rows = 3
+
+        # 计算每页显示的电影数量
+        self.movies_per_page = rows * self.grid_cols
+
+    def on_posters_frame_configure(self, event):
+        """当海报框架大小变化时，更新Canvas的滚动区域"""
+        # 连续滚动模式由 scroll_to 自行管理可视区域
+        if not self.continuous_scroll.get():
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+        # 更新Canvas内部窗口宽度
+        self.canvas.itemconfig(self.posters_window, width=event.width)
+
+    def on_mousewheel(self, event):
+        """处理鼠标滚轮事件"""
+        if self.canvas_frame.winfo_containing(event.x_root, event.y_root) == self.canvas:
+            if self.continuous_scroll.get():
+                self.scroll_to(self.scroll_offset - event.delta / 120 * CELL_HEIGHT / 3)
+            else:
+                self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """滚动条拖动或点击时更新连续滚动位置（滚动条只在连续滚动模式下显示）"""
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.scroll_height())
+        elif unit == "pages":
+            self.scroll_to(self.scroll_offset + int(amount) * self.canvas.winfo_height())
+        else:
+            self.scroll_to(self.scroll_offset + int(amount) * CELL_HEIGHT / 3)
+
+    def toggle_scroll_mode(self):
+        """在分页显示和连续滚动之间切换"""
+        self.scroll_offset = 0
+        self.canvas.yview_moveto(0)
+        self.canvas.coords(self.posters_window, 0, 0)
+        if self.continuous_scroll.get():
+            self.bottom_nav.pack_forget()
+            self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, before=self.canvas)
+        else:
+            self.scrollbar.pack_forget()
+            self.bottom_nav.pack(fill=tk.X, padx=20, pady=30)
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.load_posters()
+
+    def scroll_height(self):
+        """连续滚动模式下整个海报墙的总高度"""
+        total_rows = (len(self.visible_movies) + self.grid_cols - 1) // self.grid_cols
+        return total_rows * CELL_HEIGHT
+
+    def scroll_to(self, offset):
+        """滚动到指定像素位置，只在可见的首行变化时重新绑定卡片"""
+        canvas_height = max(1, self.canvas.winfo_height())
+        total_height = self.scroll_height()
+        offset = int(max(0, min(offset, total_height - canvas_height)))
+
+        first_row = offset // CELL_HEIGHT
+        rebind = first_row != self.scroll_offset // CELL_HEIGHT
+        self.scroll_offset = offset
+
+        # 首行内的偏移通过移动内部窗口实现平滑滚动
+        self.canvas.coords(self.posters_window, 0, -(offset % CELL_HEIGHT))
+        if rebind:
+            self.render_scroll_window()
+
+        if total_height > 0:
+            self.scrollbar.set(offset / total_height, min(1.0, (offset + canvas_height) / total_height))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def render_scroll_window(self):
+        """连续滚动模式：只为可见行（多一行缓冲）绑定卡片"""
+        canvas_height = max(1, self.canvas.winfo_height())
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), canvas_height))
+        rows = canvas_height // CELL_HEIGHT + 2
+        start_idx = self.scroll_offset // CELL_HEIGHT * self.grid_cols
+        end_idx = start_idx + rows * self.grid_cols
+        self.poster_grid.render(self.visible_movies[start_idx:end_idx], self.grid_cols, rows)
+
+        # 预取上下相邻区域的缩略图
+        self.prefetch_pages(start_idx, end_idx, rows * self.grid_cols)
+
+    def load_posters(self):
+        """根据当前页和每页显示数量加载海报"""
+        with tracer.stage("page_render"):
+            self._load_posters()
+
+    def _load_posters(self):
+        # 计算每页可显示的电影数量
+        self.calculate_movies_per_page()
+
+        # 确保每页显示的电影数量至少为1
+        if self.movies_per_page <= 0:
+            self.movies_per_page = 1
+
+        # 创建一个列表来存储所有海报图片的引用，防止被垃圾回收
+        self.poster_images = []
+
+        if self.continuous_scroll.get():
+            self.render_scroll_window()
+            self.scroll_to(self.scroll_offset)
+            return
+
+        # 获取当前页的电影数据
+        start_idx = (self.current_page - 1) * self.movies_per_page
+        end_idx = start_idx + self.movies_per_page
+        current_movies = self.visible_movies[start_idx:end_idx]
+
+        # 计算总页数
+        total_pages = max(1, (len(self.visible_movies) + self.movies_per_page - 1) // self.movies_per_page)
+
+        # 更新分页控制
+        self.update_pagination(total_pages)
+
+        # 复用卡片池显示当前页，不再销毁重建控件
+        self.poster_grid.render(current_movies, self.grid_cols, self.movies_per_page // self.grid_cols)
+
+        # 预取上一页和下一页的缩略图
+        self.prefetch_pages(start_idx, end_idx, self.movies_per_page)
+
+    def prefetch_pages(self, start_idx, end_idx, count):
+        """后台预取相邻区域的海报缩略图"""
+        prev_movies = self.visible_movies[max(0, start_idx - count):start_idx]
+        next_movies = self.visible_movies[end_idx:end_idx + count]
+        paths = [self.resolve_poster_path(m["poster_path"]) for m in next_movies + prev_movies]
+        self.poster_loader.prefetch(paths)
+
+    def resolve_poster_path(self, poster_path):
+        """海报不存在时返回默认海报路径，必要时创建默认海报"""
+        if poster_path and os.path.exists(poster_path):
+            return poster_path
+        if not os.path.exists(DEFAULT_POSTER):
+            img = Image.new('RGB', (120, 180), color=(50, 50, 50))
+            img.save(DEFAULT_POSTER)
+        return DEFAULT_POSTER
+
+    def load_poster_image(self, poster_path):
+        """加载并统一调整海报尺寸的辅助函数"""
+        try:
+            # 检查海报路径是否存在，如果不存在则使用默认海报
+            poster_path = self.resolve_poster_path(poster_path)
+
+            # 从缓存获取统一尺寸的缩略图，只有新的或已修改的海报才会解码原图
+            photo = self.poster_cache.get_photo(poster_path, GRID_SIZE)
+
+            # 保存图片引用，防止被垃圾回收
+            self.poster_images.append(photo)
+            return photo
+
+        except Exception as e:
+            print(f"Error loading poster {poster_path}: {e}")
+            return None
+
+    def update_pagination(self, total_pages):
+        """更新分页控制"""
+        # 更新页码标签
+        self.page_label.config(text=f"第 {self.current_page} 页，共 {total_pages} 页")
+
+        # 启用/禁用上一页按钮
+        if self.current_page <= 1:
+            self.prev_btn.config(state=tk.DISABLED)
+        else:
+            self.prev_btn.config(state=tk.NORMAL)
+
+        # 启用/禁用下一页按钮
+        if self.current_page >= total_pages:
+            self.next_btn.config(state=tk.DISABLED)
+        else:
+            self.next_btn.config(state=tk.NORMAL)
+
+    def prev_page(self):
+        """显示上一页"""
+        if self.current_page > 1:
+            self.current_page -= 1
+            self.load_posters()
+
+    def next_page(self):
+        """显示下一页"""
+        total_pages = (len(self.visible_movies) + self.movies_per_page - 1) // self.movies_per_page
+        if self.current_page < total_pages:
+            self.current_page += 1
+            self.load_posters()
+
+    def on_search_input(self, event):
+        """输入防抖：停止输入 300 毫秒后再搜索"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(300, self.search_movies)
+
+    @staticmethod
+    def query_key(query):
+        """比较查询是否变化时使用：规范化并合并空白"""
+        return " ".join(normalize(query).split())
+
+    def search_movies(self):
+        """搜索电影，只改变显示的列表，不修改 movies_data；查询内容没有变化时保持当前页"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+
+        if self.query_key(self.search_entry.get()) == self._last_query:
+            return
+        self.refresh_view()
+
+    def refresh_view(self, keep_page=False):
+        """按当前搜索条件重新生成显示列表，并回到第一页（keep_page 时保持当前位置）
+
+        条件中含有尚未缓存的详情字段时先在后台查询，查询完成后再筛选和刷新。
+        """
+        query = self.search_entry.get()
+        self._last_query = self.query_key(query)
+        pending = self.search_index.pending_details(query)
+        if pending:
+            self.start_detail_search(pending, keep_page)
+            return
+
+        with tracer.stage("search"):
+            self.visible_movies = self.search_index.filter(self.catalog.ordered(), query)
+
+        if not keep_page:
+            # 重置分页状态
+            self.current_page = 1
+            self.scroll_offset = 0
+        self.load_posters()
+
+    def show_movie_detail(self, movie):
+        """显示电影详情"""
+        # 打开详情页时才读取剧情简介、下载链接等详情字段
+        movie.ensure_details()
+        detail_frame = ttk.Frame(self.notebook)
+        MovieDetailWindow(self, detail_frame, movie, self.update_level, self.save_movies_data)
+        self.notebook.add(detail_frame, text=movie["title"])
+        self.notebook.select(detail_frame)
+
+    def update_level(self, movie, new_level):
+        """更新电影评分"""
+        # 更新电影数据，海报墙和已打开的详情页通过目录事件各自刷新
+        movie = self.catalog.update(movie["id"], level=str(new_level))
+
+        # 连续点击评分时合并为一次写入
+        self.writer.put(movie)
+
+        messagebox.showinfo("提示", f"已将《{movie['title']}》的评分更新为{new_level}星")
+
+    def show_add_movie_window(self):
+        """显示添加电影窗口"""
+        add_frame = ttk.Frame(self.notebook)
+        AddMovieWindow(self, add_frame, self.add_movie)
+        self.notebook.add(add_frame, text="添加影片")
+        self.notebook.select(add_frame)
+
+    def add_movie(self, new_movie):
+        """添加新电影"""
+        ensure_id(new_movie)
+        new_movie = MovieRecord.from_dict(new_movie, loader=self.store.load_details)
+        self.catalog.add(new_movie)
+        self.writer.put(new_movie)
+
+        # 重置分页状态并刷新显示
+        self.refresh_view()
+
+        messagebox.showinfo("提示", "影片添加成功")
+        print(f"添加新电影: {new_movie['title']}")
+
+        # 确保保存电影数据
+        save_success = self.save_movies_data()
+        if save_success:
+            print(f"电影数据已成功保存: {new_movie['title']}")
+        else:
+            print(f"保存电影数据失败: {new_movie['title']}")
+
+    def show_perf_window(self):
+        """显示耗时统计标签页"""
+        perf_frame = ttk.Frame(self.notebook)
+        PerfSummaryWindow(self, perf_frame)
+        self.notebook.add(perf_frame, text="耗时统计")
+        self.notebook.select(perf_frame)
+
+    def toggle_trace(self):
+        """菜单开关：开始或停止记录各阶段耗时"""
+        tracer.enabled = self.trace_enabled.get()
+
+    def show_bulk_import_window(self):
+        """显示批量导入窗口"""
+        import_frame = ttk.Frame(self.notebook)
+        BulkImportWindow(self, import_frame, self.import_movies)
+        self.notebook.add(import_frame, text="批量导入")
+        self.notebook.select(import_frame)
+
+    def import_movies(self, new_movies):
+        """批量添加电影：一次性写入存储，最后只刷新一次海报墙"""
+        if not new_movies:
+            return
+        try:
+            self.store.put_many(new_movies)
+        except Exception as e:
+            self.show_save_error(e)
+            return
+
+        # 已写入存储，内存中只保留摘要，详情在打开详情页时再读取
+        records = self.catalog.extend(
+            [MovieRecord.from_summary(movie, loader=self.store.load_details) for movie in new_movies])
+
+        self.refresh_view()
+        print(f"批量添加 {len(records)} 部电影")
+
+    def replace_movie(self, old_movie, new_movie):
+        """用编辑窗口提交的字段原地更新记录（id 不变），返回是否找到原记录"""
+        if old_movie["id"] not in self.catalog:
+            return False
+        changes = {key: value for key, value in new_movie.items() if key != "id"}
+        # 只有显示该电影的卡片会重绘，不再刷新整页
+        record = self.catalog.update(old_movie["id"], **changes)
+        self.writer.put(record)
+        return True
+
+    def save_movies_data(self):
+        """立即写入所有待保存的修改，返回保存是否成功"""
+        return self.writer.flush()
+
+    def show_save_error(self, error):
+        """保存失败时提示详细信息"""
+        error_info = f"保存电影数据失败: {str(error)}\n"
+        error_info += f"错误类型: {type(error).__name__}\n"
+        error_info += f"当前工作目录: {os.getcwd()}"
+        messagebox.showerror("错误", error_info)
+
+    # 其他方法保持不变
+    def play_movie(self, movie):
+        messagebox.showinfo("提示", f"即将播放 {movie['title']}")
+
+    def follow_movie(self, movie):
+        messagebox.showinfo("提示", f"已关注 {movie['title']}")
+
+    def choose_subtitle(self, subtitle):
+        messagebox.showinfo("提示", f"已选择字幕：{subtitle}")
+
+    def delete_movie(self, movie):
+        # 按 id 从目录中删除该电影
+        self.catalog.delete(movie["id"])
+        self.writer.delete(movie)
+
+        # 重置分页状态并重新加载海报
+        self.refresh_view()
+
+        # 保存更新后的电影数据到文件
+        self.save_movies_data()
+        messagebox.showinfo("提示", f"已删除《{movie['title']}》")
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    style = ttk.Style(root)
+    style.theme_use("clam")
+
+    # 配置深色风格
+    style.configure("SearchFrame.TFrame", background="#1E1E1E")
+    style.configure("PostersFrame.TFrame", background="#1E1E1E")
+    style.configure("PosterFrame.TFrame", background="#1E1E1E")
+    style.configure("TitleLabel.TLabel", background="#1E1E1E", foreground="white", font=("Helvetica", 10, "bold"))
+    style.configure("StarsLabel.TLabel", background="#1E1E1E", foreground="#AAAAAA", font=("Helvetica", 9))
+    style.configure("InfoFrame.TFrame", background="#1E1E1E")
+    style.configure("DetailTitle.TLabel", background="#1E1E1E", foreground="white")
+    style.configure("DetailText.TLabel", background="#1E1E1E", foreground="white")
+    style.configure("BtnFrame.TFrame", background="#1E1E1E")
+    style.configure("TButton", background="#333333", foreground="white", borderwidth=0, focuscolor="#333333")
+    style.map("TButton", background=[("active", "#444444")])
+
+    app = MovieLibraryApp(root)
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,244 @@
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+from poster_cache import DETAIL_SIZE
+from perf_trace import tracer
+
+# 窗口放大后，画布超过预渲染尺寸这么多倍才从原图重新缩放
+UPGRADE_RATIO = 1.1
+
+
+class MovieDetailWindow:
+    def __init__(self, parent, frame, movie, update_level_callback, save_data_callback):
+        self.parent = parent
+        self.movie = movie
+        self.update_level_callback = update_level_callback
+        self.save_data_callback = save_data_callback
+
+        self.window = frame
+        # self.window.configure(bg="#1E1E1E")
+
+        # 创建主框架
+        main_frame = ttk.Frame(self.window, style="InfoFrame.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        main_frame.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+
+        # 创建Canvas来显示图片，随窗口放大
+        self.canvas = tk.Canvas(main_frame, width=DETAIL_SIZE[0], height=DETAIL_SIZE[1], bg="#1E1E1E",
+                                highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky=tk.NSEW, pady=(0, 20))
+        self.photo = None
+        self.photo_size = DETAIL_SIZE  # 当前显示的海报对应的目标尺寸
+        self._upgrade_job = None
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+
+        # 按钮框架
+        btn_frame = ttk.Frame(main_frame, style="BtnFrame.TFrame")
+        btn_frame.grid(row=1, column=0, sticky=tk.W, pady=(0, 20))
+
+        ttk.Button(btn_frame, text="播放", command=self.play_movie).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(btn_frame, text="修改信息", command=self.show_edit_movie_window).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(btn_frame, text="删除", command=self.delete_movie).pack(side=tk.LEFT)
+
+        # 信息框架
+        info_frame = ttk.Frame(main_frame, style="InfoFrame.TFrame")
+        info_frame.grid(row=2, column=0, sticky=tk.W)
+
+        # 标题
+        self.title_label = ttk.Label(info_frame, text=f"{self.movie['title']}",
+                                     style="DetailTitle.TLabel", font=("Helvetica", 18, "bold"))
+        self.title_label.pack(anchor=tk.W, pady=(0, 10))
+
+        # 电影信息
+        fields = ["stars", "download_link", "watch_link"]
+        labels = ["主演", "下载链接", "观看链接"]
+
+        self.field_labels = {}
+        for field, label_text in zip(fields, labels):
+            text = self.movie.get(field, "")
+            label = ttk.Label(info_frame, text=f"{label_text}：{text}", style="DetailText.TLabel")
+            label.pack(anchor=tk.W, pady=5)
+            self.field_labels[field] = (label, label_text)
+
+        # 评分星级
+        rating_frame = ttk.Frame(info_frame, style="PosterFrame.TFrame")
+        rating_frame.pack(anchor=tk.W, pady=20)
+
+        rating_label = ttk.Label(rating_frame, text="评分：", style="DetailText.TLabel")
+        rating_label.pack(side=tk.LEFT)
+
+        current_level = int(float(self.movie["level"])) if self.movie["level"] else 0
+        self.rating_widgets = []
+
+        for i in range(5):
+            star_label = ttk.Label(rating_frame,
+                                   image=self.parent.STAR_FILLED if i < current_level else self.parent.STAR_EMPTY)
+            star_label.image = self.parent.STAR_FILLED if i < current_level else self.parent.STAR_EMPTY
+            star_label.pack(side=tk.LEFT, padx=2)
+            star_label.bind("<Button-1>", lambda event, idx=i: self.update_level(idx + 1))
+            self.rating_widgets.append(star_label)
+
+        # 剧情简介
+        synopsis = self.movie.get("synopsis", "")
+        self.synopsis_label = ttk.Label(info_frame, text=f"剧情简介：{synopsis}", style="DetailText.TLabel",
+                                        wraplength=700)
+        self.synopsis_label.pack(anchor=tk.W, pady=20)
+
+        # 加载并显示图片
+        self.poster_path = self.movie["poster_path"]
+        self.load_poster()
+
+        # 订阅目录变更：其他地方修改或删除该电影时同步刷新，标签页关闭时取消订阅
+        self.unsubscribe = self.parent.catalog.subscribe(self.on_catalog_change)
+        self.window.bind("<Destroy>", lambda event: self.unsubscribe() if event.widget is self.window else None)
+
+    def on_catalog_change(self, event, records):
+        if not any(record["id"] == self.movie["id"] for record in records):
+            return
+        if event == "delete":
+            self.close()
+        elif event == "update":
+            self.refresh()
+
+    def refresh(self):
+        """按最新的记录刷新显示内容"""
+        self.title_label.config(text=self.movie["title"])
+        for field, (label, label_text) in self.field_labels.items():
+            label.config(text=f"{label_text}：{self.movie.get(field, '')}")
+        self.synopsis_label.config(text=f"剧情简介：{self.movie.get('synopsis', '')}")
+        self.show_level(int(float(self.movie["level"])) if self.movie["level"] else 0)
+        self.parent.notebook.tab(self.window, text=self.movie["title"])
+        if self.movie["poster_path"] != self.poster_path:
+            self.poster_path = self.movie["poster_path"]
+            self.load_poster()
+
+    def close(self):
+        """关闭当前标签页"""
+        if self.window.winfo_exists():
+            self.window.destroy()
+
+    def load_poster(self):
+        """显示详情尺寸的海报，画布更大时再在后台从原图缩放
+
+        详情尺寸通常已在导入时生成，内存或磁盘命中时立即显示；尚未生成时（旧海报、
+        手动添加的影片）先显示占位，在后台解码原图并写入磁盘缓存，不阻塞界面。
+        """
+        poster_path = self.parent.resolve_poster_path(self.movie["poster_path"])
+        self.photo = None
+        self.photo_size = DETAIL_SIZE
+
+        start = time.perf_counter()
+        photo = self.parent.poster_loader.request(
+            poster_path, lambda p: self.on_detail_loaded(poster_path, start, p),
+            size=DETAIL_SIZE, padded=False, track=False,
+            error_callback=lambda e: self.on_detail_failed(poster_path, e))
+        if photo is not None:
+            self.on_detail_loaded(poster_path, start, photo)
+        else:
+            self.show_message("加载中...")
+
+    def on_detail_loaded(self, poster_path, start, photo):
+        if not self.is_current(poster_path) or self.photo_size != DETAIL_SIZE:
+            return
+        tracer.record("detail_poster", time.perf_counter() - start)
+        self.show_photo(photo)
+        self.request_upgrade()
+
+    def on_detail_failed(self, poster_path, error):
+        if not self.is_current(poster_path):
+            return
+        print(f"Error loading poster: {error}")
+        # 如果加载失败，显示错误信息
+        self.show_message("无法加载海报")
+
+    def is_current(self, poster_path):
+        """标签页仍然打开，且电影的海报没有被更换"""
+        return (self.canvas.winfo_exists()
+                and poster_path == self.parent.resolve_poster_path(self.movie["poster_path"]))
+
+    def show_message(self, text):
+        self.canvas.delete("all")
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:  # 画布尚未布局
+            width, height = DETAIL_SIZE
+        self.canvas.create_text(width // 2, height // 2, text=text, fill="white", font=("Helvetica", 14),
+                                tags="poster")
+
+    def show_photo(self, photo):
+        """在画布中央按原比例显示海报"""
+        self.photo = photo
+        self.canvas.delete("all")
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:  # 画布尚未布局
+            width, height = DETAIL_SIZE
+        self.canvas.create_image(width // 2, height // 2, anchor=tk.CENTER, image=photo, tags="poster")
+
+    def on_canvas_configure(self, event):
+        self.canvas.coords("poster", event.width // 2, event.height // 2)
+        # 拖动窗口时会连续触发，稍后再决定是否需要更大的海报
+        if self._upgrade_job is not None:
+            self.canvas.after_cancel(self._upgrade_job)
+        self._upgrade_job = self.canvas.after(200, self.request_upgrade)
+
+    def request_upgrade(self):
+        """画布明显大于当前海报尺寸时，在后台从原图按画布尺寸重新缩放"""
+        self._upgrade_job = None
+        if self.photo is None or not self.canvas.winfo_exists():
+            return
+        size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        if (size[0] <= self.photo_size[0] * UPGRADE_RATIO and size[1] <= self.photo_size[1] * UPGRADE_RATIO):
+            return
+
+        poster_path = self.parent.resolve_poster_path(self.movie["poster_path"])
+        self.photo_size = size
+        # 临时尺寸只保存在内存缓存中，不写入磁盘；翻页不会取消该任务
+        photo = self.parent.poster_loader.request(poster_path, lambda p: self.on_upgrade(poster_path, size, p),
+                                                  size=size, padded=False, persist=False, track=False)
+        if photo is not None:
+            self.on_upgrade(poster_path, size, photo)
+
+    def on_upgrade(self, poster_path, size, photo):
+        # 期间海报被更换、窗口再次调整或标签页已关闭时丢弃结果
+        if not self.is_current(poster_path) or size != self.photo_size:
+            return
+        self.show_photo(photo)
+
+    def show_level(self, level):
+        for i, star in enumerate(self.rating_widgets):
+            star.config(image=self.parent.STAR_FILLED if i < level else self.parent.STAR_EMPTY)
+            star.image = self.parent.STAR_FILLED if i < level else self.parent.STAR_EMPTY
+
+    def update_level(self, new_level):
+        # 星星显示通过目录的 update 事件刷新
+        self.update_level_callback(self.movie, new_level)
+
+    def play_movie(self):
+        messagebox.showinfo("提示", f"即将播放 {self.movie['title']}")
+
+    def follow_movie(self):
+        messagebox.showinfo("提示", f"已关注 {self.movie['title']}")
+
+    def choose_subtitle(self, subtitle):
+        messagebox.showinfo("提示", f"已选择字幕：{subtitle}")
+
+    def delete_movie(self):
+        # 弹出二次确认窗口
+        confirm = messagebox.askyesno("确认删除", f"确定要删除《{self.movie['title']}》吗？")
+        if confirm:
+            # 调用主窗口的删除方法，当前标签页通过目录的 delete 事件关闭
+            self.parent.delete_movie(self.movie)
+
+    def show_edit_movie_window(self):
+        edit_frame = ttk.Frame(self.parent.notebook)
+        from movie_edit import EditMovieWindow
+        EditMovieWindow(self.parent, edit_frame, self.movie, self.update_movie)
+        self.parent.notebook.add(edit_frame, text=f"修改 {self.movie['title']}")
+        self.parent.notebook.select(edit_frame)
+
+    def update_movie(self, updated_movie):
+        if self.parent.replace_movie(self.movie, updated_movie):
+            self.save_data_callback()
+            messagebox.showinfo("提示", "影片信息更新成功")
+            # 关闭当前标签页
+            self.close()
\ No newline at end of file
@@ -0,0 +1,130 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import queue
+import threading
+from bulk_import import BulkImporter
+
+
+class BulkImportWindow:
+    def __init__(self, parent, frame, import_movies_callback):
+        self.parent = parent
+        self.import_movies_callback = import_movies_callback
+        self.importer = None
+        self._events = queue.SimpleQueue()  # 后台线程 -> 主线程的进度消息
+
+        self.window = frame
+        self.create_ui()
+
+    def create_ui(self):
+        main_frame = ttk.Frame(self.window, style="PosterFrame.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # 图片目录
+        images_label = ttk.Label(main_frame, text="海报目录（文件名作为标题）：", style="DetailText.TLabel")
+        images_label.pack(pady=(0, 5), anchor=tk.W)
+        images_row = ttk.Frame(main_frame, style="PosterFrame.TFrame")
+        images_row.pack(pady=(0, 10), anchor=tk.W)
+        self.images_entry = ttk.Entry(images_row, width=50)
+        self.images_entry.pack(side=tk.LEFT)
+        ttk.Button(images_row, text="选择", command=self.choose_images_dir).pack(side=tk.LEFT, padx=5)
+
+        # 清单文件
+        manifest_label = ttk.Label(main_frame, text="清单文件（CSV / JSONL，可选）：", style="DetailText.TLabel")
+        manifest_label.pack(pady=(0, 5), anchor=tk.W)
+        manifest_row = ttk.Frame(main_frame, style="PosterFrame.TFrame")
+        manifest_row.pack(pady=(0, 10), anchor=tk.W)
+        self.manifest_entry = ttk.Entry(manifest_row, width=50)
+        self.manifest_entry.pack(side=tk.LEFT)
+        ttk.Button(manifest_row, text="选择", command=self.choose_manifest).pack(side=tk.LEFT, padx=5)
+
+        # 进度条
+        self.progress = ttk.Progressbar(main_frame, length=400, mode="determinate")
+        self.progress.pack(pady=(10, 5), anchor=tk.W)
+        self.status_label = ttk.Label(main_frame, text="", style="DetailText.TLabel")
+        self.status_label.pack(pady=(0, 10), anchor=tk.W)
+
+        btn_frame = ttk.Frame(main_frame, style="BtnFrame.TFrame")
+        btn_frame.pack(anchor=tk.W)
+        self.start_btn = ttk.Button(btn_frame, text="开始导入", command=self.start_import)
+        self.start_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.cancel_btn = ttk.Button(btn_frame, text="取消", command=self.cancel_import, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT)
+
+    def choose_images_dir(self):
+        path = filedialog.askdirectory(title="选择海报目录")
+        if path:
+            self.images_entry.delete(0, tk.END)
+            self.images_entry.insert(0, path)
+
+    def choose_manifest(self):
+        path = filedialog.askopenfilename(title="选择清单文件",
+                                          filetypes=[("清单", "*.csv *.jsonl *.ndjson"), ("所有文件", "*.*")])
+        if path:
+            self.manifest_entry.delete(0, tk.END)
+            self.manifest_entry.insert(0, path)
+
+    def start_import(self):
+        images_dir = self.images_entry.get().strip() or None
+        manifest = self.manifest_entry.get().strip() or None
+        if not images_dir and not manifest:
+            messagebox.showerror("错误", "请选择海报目录或清单文件")
+            return
+        if not self.parent.summaries_loaded:
+            # 片库尚未全部读入时，标题去重会漏掉还没加载的电影
+            messagebox.showinfo("提示", "片库仍在加载中，请稍后再导入")
+            return
+
+        self.importer = BulkImporter(existing_titles=[m["title"] for m in self.parent.movies_data],
+                                     existing_posters=[m["poster_path"] for m in self.parent.movies_data])
+        self.start_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.status_label.config(text="正在扫描...")
+
+        # 海报处理在后台线程（内部使用进程池）中进行，界面通过轮询获取进度
+        threading.Thread(target=self._run, args=(images_dir, manifest), daemon=True).start()
+        self.window.after(100, self._poll)
+
+    def _run(self, images_dir, manifest):
+        try:
+            items = self.importer.collect(images_dir, manifest)
+            result = self.importer.run(items, progress=lambda done, total: self._events.put(("progress", done, total)))
+            self._events.put(("done", result))
+        except Exception as e:
+            self._events.put(("error", e))
+
+    def _poll(self):
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            if event[0] == "progress":
+                _, done, total = event
+                self.progress.config(maximum=max(1, total), value=done)
+                self.status_label.config(text=f"正在处理海报 {done}/{total}")
+            elif event[0] == "error":
+                self.finish()
+                messagebox.showerror("错误", f"批量导入失败: {event[1]}")
+                return
+            else:
+                self.finish()
+                self.on_done(event[1])
+                return
+        self.window.after(100, self._poll)
+
+    def on_done(self, result):
+        self.status_label.config(text=result.summary())
+        for title, reason in result.skipped + result.failed:
+            print(f"未导入《{title}》: {reason}")
+        self.import_movies_callback(result.movies)
+        messagebox.showinfo("提示", f"批量导入完成：{result.summary()}")
+
+    def finish(self):
+        self.start_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+
+    def cancel_import(self):
+        if self.importer is not None:
+            self.importer.cancel()
+            self.status_label.config(text="正在取消...")
@@ -0,0 +1,82 @@
+# 海报墙和搜索需要的摘要字段，启动时只读取这些字段
+SUMMARY_FIELDS = ("title", "poster_path", "stars", "director", "level")
+# 详情字段，打开详情页时才从存储中读取
+DETAIL_FIELDS = ("type", "region", "download_link", "watch_link", "synopsis")
+
+
+class MovieRecord:
+    """紧凑的电影记录：摘要字段放在 __slots__ 中，详情字段按需加载
+
+    支持 movie["title"]、movie.get("synopsis", "") 等字典式访问，
+    访问尚未加载的详情字段时自动通过 loader 读取。
+    """
+
+    __slots__ = ("id", "title", "poster_path", "stars", "director", "level", "_details", "_loader")
+
+    def __init__(self, id, title="", poster_path="", stars="", director="", level="",
+                 details=None, loader=None):
+        self.id = id
+        self.title = title
+        self.poster_path = poster_path
+        self.stars = stars
+        self.director = director
+        self.level = level
+        self._details = details  # None 表示详情尚未加载
+        self._loader = loader
+
+    @classmethod
+    def from_dict(cls, movie, loader=None):
+        """从字典创建记录，非摘要字段全部作为详情保存"""
+        details = {k: v for k, v in movie.items() if k != "id" and k not in SUMMARY_FIELDS}
+        return cls(movie.get("id", ""), *(str(movie.get(f) or "") for f in SUMMARY_FIELDS),
+                   details=details, loader=loader)
+
+    @classmethod
+    def from_summary(cls, movie, loader):
+        """从字典创建只含摘要字段的记录（详情已保存在存储中，访问时通过 loader 读取）"""
+        return cls(movie.get("id", ""), *(str(movie.get(f) or "") for f in SUMMARY_FIELDS), loader=loader)
+
+    @property
+    def details_loaded(self):
+        return self._details is not None
+
+    def ensure_details(self):
+        """加载详情字段（已加载时不做任何事）"""
+        if self._details is None:
+            self._details = self._loader(self.id) if self._loader else {}
+        return self._details
+
+    def __getitem__(self, key):
+        if key == "id" or key in SUMMARY_FIELDS:
+            return getattr(self, key)
+        return self.ensure_details()[key]
+
+    def __setitem__(self, key, value):
+        if key == "id" or key in SUMMARY_FIELDS:
+            setattr(self, key, value)
+        else:
+            self.ensure_details()[key] = value
+
+    def __contains__(self, key):
+        return key == "id" or key in SUMMARY_FIELDS or key in self.ensure_details()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def summary(self):
+        """只包含摘要字段的字典"""
+        data = {"id": self.id}
+        data.update((f, getattr(self, f)) for f in SUMMARY_FIELDS)
+        return data
+
+    def to_dict(self):
+        """完整记录（会加载详情）"""
+        data = self.summary()
+        data.update(self.ensure_details())
+        return data
+
+    def __repr__(self):
+        return f"MovieRecord(id={self.id!r}, title={self.title!r})"
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 设置 VIDEOSTORE_TRACE=1 时启动即记录耗时，也可以在界面的“调试”菜单中随时开关
+TRACE_ENABLED = os.environ.get("VIDEOSTORE_TRACE", "") not in ("", "0")
+# 每个阶段保留的最近样本数，用于计算分位数
+SAMPLE_WINDOW = 1000
+
+
+class StageStats:
+    """单个阶段的累计统计和最近样本"""
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class PerfTrace:
+    """按阶段记录耗时（解码、缩放、控件构建、存储读写等），可在多个线程中使用
+
+    用法：
+        with tracer.stage("decode"):
+            ...
+    关闭时 stage() 只返回一个空的上下文管理器，几乎没有额外开销。
+    """
+
+    def __init__(self, enabled=TRACE_ENABLED):
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = StageStats()
+            stats.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def summary(self):
+        """返回 {阶段: {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms}}，可直接写入 JSON"""
+        with self._lock:
+            items = [(name, stats.count, stats.total, stats.max, stats.percentile(0.5), stats.percentile(0.95))
+                     for name, stats in self._stats.items()]
+        return {name: {"count": count,
+                       "total_ms": round(total * 1000, 3),
+                       "mean_ms": round(total / count * 1000, 3),
+                       "p50_ms": round(p50 * 1000, 3),
+                       "p95_ms": round(p95 * 1000, 3),
+                       "max_ms": round(peak * 1000, 3)}
+                for name, count, total, peak, p50, p95 in sorted(items)}
+
+    def format_summary(self):
+        """文本表格，用于界面上的实时统计和命令行输出"""
+        summary = self.summary()
+        if not summary:
+            return "尚无记录" if self.enabled else "耗时记录未开启"
+        # 表头用 ASCII，保证等宽字体下对齐
+        lines = [f"{'stage':<18}{'count':>8}{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}{'max_ms':>10}{'total_ms':>12}"]
+        for name, s in summary.items():
+            lines.append(f"{name:<18}{s['count']:>8}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}"
+                         f"{s['p95_ms']:>10.2f}{s['max_ms']:>10.2f}{s['total_ms']:>12.1f}")
+        return "\n".join(lines)
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+# 全局记录器，各模块共用
+tracer = PerfTrace()
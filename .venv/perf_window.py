@@ -0,0 +1,54 @@
+import tkinter as tk
+from tkinter import ttk
+from perf_trace import tracer
+
+# 统计表刷新间隔（毫秒）
+REFRESH_INTERVAL = 1000
+
+
+class PerfSummaryWindow:
+    """耗时统计标签页：每秒刷新一次各阶段的耗时分布"""
+
+    def __init__(self, parent, frame):
+        self.parent = parent
+        self.window = frame
+
+        main_frame = ttk.Frame(self.window, style="InfoFrame.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        btn_frame = ttk.Frame(main_frame, style="BtnFrame.TFrame")
+        btn_frame.pack(anchor=tk.W, pady=(0, 10))
+        ttk.Checkbutton(btn_frame, text="记录耗时", variable=self.parent.trace_enabled,
+                        command=self.parent.toggle_trace).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(btn_frame, text="清空", command=self.reset).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(btn_frame, text="关闭", command=self.close).pack(side=tk.LEFT)
+
+        self.text = tk.Text(main_frame, bg="#1E1E1E", fg="white", font=("Courier", 10),
+                            highlightthickness=0, borderwidth=0)
+        self.text.pack(fill=tk.BOTH, expand=True)
+
+        self._job = None
+        self.refresh()
+        self.window.bind("<Destroy>", self.on_destroy)
+
+    def refresh(self):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, tracer.format_summary())
+        self.text.config(state=tk.DISABLED)
+        self._job = self.window.after(REFRESH_INTERVAL, self.refresh)
+
+    def reset(self):
+        tracer.reset()
+        self.window.after_cancel(self._job)
+        self.refresh()
+
+    def on_destroy(self, event):
+        if event.widget is self.window and self._job is not None:
+            self.window.after_cancel(self._job)
+            self._job = None
+
+    def close(self):
+        """关闭当前标签页"""
+        if self.window.winfo_exists():
+            self.window.destroy()
@@ -0,0 +1,202 @@
+import tkinter as tk
+from tkinter import ttk
+from perf_trace import tracer
+
+# 海报卡片尺寸及外边距
+TILE_WIDTH = 180
+TILE_HEIGHT = 260
+TILE_PAD = 5
+# 每个格子占用的尺寸（含左右/上下边距）
+CELL_WIDTH = TILE_WIDTH + 2 * TILE_PAD
+CELL_HEIGHT = TILE_HEIGHT + 2 * TILE_PAD
+
+
+class PosterTile:
+    """可复用的海报卡片：控件只创建一次，翻页时重新绑定到新的电影记录"""
+
+    def __init__(self, grid, parent):
+        self.grid = grid
+        self.app = grid.app
+        self.movie = None
+        self.poster_path = None
+        self.photo_ready = False
+        self.position = None
+
+        # 创建固定大小的海报框架
+        self.frame = ttk.Frame(parent, style="PosterFrame.TFrame", width=TILE_WIDTH, height=TILE_HEIGHT)
+        self.frame.grid_propagate(False)  # 防止框架根据内容调整大小
+
+        # 创建海报容器
+        image_container = ttk.Frame(self.frame, style="PosterFrame.TFrame")
+        image_container.pack(side=tk.TOP, fill=tk.X, pady=(5, 0))
+
+        # 创建海报标签
+        self.poster_label = ttk.Label(image_container)
+        self.poster_label.pack()
+
+        # 创建标题容器，使用固定高度并允许文本溢出
+        title_container = ttk.Frame(self.frame, style="PosterFrame.TFrame", height=40)
+        title_container.pack(side=tk.TOP, fill=tk.X, pady=2)
+        title_container.pack_propagate(False)
+
+        self.title_label = ttk.Label(title_container, style="TitleLabel.TLabel", wraplength=TILE_WIDTH)
+        self.title_label.pack(fill=tk.BOTH, expand=True)
+
+        # 主演信息容器
+        stars_container = ttk.Frame(self.frame, style="PosterFrame.TFrame", height=30)
+        stars_container.pack(side=tk.TOP, fill=tk.X, pady=2)
+        stars_container.pack_propagate(False)
+
+        self.stars_label = ttk.Label(stars_container, style="StarsLabel.TLabel", wraplength=TILE_WIDTH)
+        self.stars_label.pack(fill=tk.BOTH, expand=True)
+
+        # 评分星级
+        stars_frame = ttk.Frame(self.frame, style="PosterFrame.TFrame")
+        stars_frame.pack(side=tk.TOP, pady=5, anchor=tk.W)
+
+        self.star_widgets = []
+        for i in range(5):
+            if self.app.use_image_stars:
+                star_label = ttk.Label(stars_frame)
+            else:
+                star_label = ttk.Label(stars_frame, font=("Helvetica", 14))
+            star_label.pack(side=tk.LEFT, padx=2)
+            self.star_widgets.append(star_label)
+
+        # 点击事件只绑定一次，打开当前绑定的电影
+        for widget in (self.frame, self.poster_label, self.title_label, self.stars_label):
+            widget.bind("<Button-1>", self.on_click)
+
+    def on_click(self, event):
+        if self.movie is not None:
+            self.app.show_movie_detail(self.movie)
+
+    def bind_movie(self, movie):
+        """把卡片绑定到一条电影记录，只更新文字、星级和图片"""
+        if self.movie is not movie:
+            self.unbind()
+        self.movie = movie
+        self.grid.bindings[movie["id"]] = self
+        self.title_label.config(text=movie["title"])
+
+        stars_text = movie.get("stars", "")
+        self.stars_label.config(text=stars_text if len(stars_text) <= 15 else stars_text[:15] + "...")
+
+        self.show_level(int(float(movie["level"])) if movie["level"] else 0)
+
+        # 海报未变且已加载完成时无需重新请求
+        poster_path = self.app.resolve_poster_path(movie["poster_path"])
+        if poster_path != self.poster_path or not self.photo_ready:
+            self.poster_path = poster_path
+            self.load_photo()
+
+    def load_photo(self):
+        """缓存命中时立即显示，否则先显示占位图，等后台解码完成后替换"""
+        movie = self.movie
+        photo = self.app.poster_loader.request(
+            self.poster_path, lambda p: self.set_photo(p) if self.movie is movie else None)
+        if photo is not None:
+            self.set_photo(photo)
+        else:
+            self.photo_ready = False
+            self.poster_label.config(image=self.grid.placeholder)
+            self.poster_label.image = self.grid.placeholder
+
+    def set_photo(self, photo):
+        self.poster_label.config(image=photo)
+        self.poster_label.image = photo
+        self.photo_ready = True
+
+    def show_level(self, level):
+        """更新星级显示"""
+        for i, star in enumerate(self.star_widgets):
+            if self.app.use_image_stars:
+                star.config(image=self.app.STAR_FILLED if i < level else self.app.STAR_EMPTY)
+                star.image = self.app.STAR_FILLED if i < level else self.app.STAR_EMPTY
+            else:
+                star.config(text="★" if i < level else "☆",
+                            foreground="#FFD700" if i < level else "#AAAAAA")
+
+    def place(self, row, col):
+        if self.position != (row, col):
+            self.frame.grid(row=row, column=col, padx=TILE_PAD, pady=TILE_PAD)
+            self.position = (row, col)
+
+    def hide(self):
+        if self.position is not None:
+            self.frame.grid_remove()
+            self.position = None
+        self.unbind()
+        self.movie = None
+
+    def unbind(self):
+        """移除本卡片的绑定；同一次渲染中旧电影可能已移到其他卡片，此时保留那张卡片的绑定"""
+        if self.movie is not None and self.grid.bindings.get(self.movie["id"]) is self:
+            del self.grid.bindings[self.movie["id"]]
+
+    def destroy(self):
+        self.hide()
+        self.frame.destroy()
+
+
+class PosterGrid:
+    """虚拟化海报墙：维护与可见行×列数量一致的卡片池，翻页和滚动时只重新绑定数据"""
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.parent = parent
+        self.tiles = []
+        self.bindings = {}  # 电影 id -> 正在显示它的卡片，界面绑定不写入记录本身
+        self.cols = 0
+        self.placeholder = None
+
+        # 订阅目录变更，修改某部电影时只重绘对应的卡片
+        self.app.catalog.subscribe(self.on_catalog_change)
+
+        # 没有电影时显示的提示信息
+        self.empty_label = ttk.Label(parent, text="没有找到电影", style="TitleLabel.TLabel")
+
+    def render(self, movies, cols, rows):
+        """显示 movies 中的前 rows×cols 部电影，按需增减卡片"""
+        self.placeholder = self.app.load_poster_image(None)  # 默认海报
+        self.resize_pool(rows * cols)
+
+        if cols != self.cols:
+            # 列数变化时所有卡片都要重新排布
+            self.cols = cols
+            for tile in self.tiles:
+                tile.hide()
+
+        # 切换到新的一组电影，取消旧的解码任务
+        self.app.poster_loader.new_generation()
+
+        if not movies:
+            for tile in self.tiles:
+                tile.hide()
+            self.empty_label.grid(row=0, column=0, padx=20, pady=20)
+            return
+        self.empty_label.grid_remove()
+
+        with tracer.stage("widget_build"):
+            for index, tile in enumerate(self.tiles):
+                if index < len(movies):
+                    tile.place(index // cols, index % cols)
+                    tile.bind_movie(movies[index])
+                else:
+                    tile.hide()
+
+    def resize_pool(self, count):
+        """卡片池只增加缺少的卡片或销毁多余的卡片"""
+        while len(self.tiles) < count:
+            self.tiles.append(PosterTile(self, self.parent))
+        while len(self.tiles) > count:
+            self.tiles.pop().destroy()
+
+    def on_catalog_change(self, event, records):
+        """电影信息变化时只刷新显示该电影的卡片"""
+        if event != "update":
+            return
+        for record in records:
+            tile = self.bindings.get(record["id"])
+            if tile is not None:
+                tile.bind_movie(record)
@@ -0,0 +1,106 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from PIL import ImageTk
+from poster_cache import tile_key, GRID_SIZE
+from perf_trace import tracer
+
+# 主线程轮询解码结果的间隔（毫秒）
+POLL_INTERVAL = 30
+
+
+class PosterLoader:
+    """后台线程池解码海报缩略图，通过 root.after 轮询把结果交回 Tk 主线程"""
+
+    def __init__(self, root, cache, max_workers=None):
+        self.root = root
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 2),
+                                           thread_name_prefix="poster-decode")
+        self.generation = 0  # 每次切换页面加一，旧页面的任务据此作废
+        self._futures = []  # 当前代尚未完成的任务
+        self._results = queue.SimpleQueue()
+        self._closed = False
+        self._poll_id = self.root.after(POLL_INTERVAL, self._poll)
+
+    def new_generation(self):
+        """开始新的一页：取消所有尚未开始的旧任务，返回新的代号"""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self.generation += 1
+        return self.generation
+
+    def request(self, poster_path, callback, size=GRID_SIZE, padded=True, persist=True, track=True,
+                error_callback=None):
+        """请求缩略图。内存命中时直接返回 PhotoImage，否则返回 None 并在解码完成后回调
+
+        track 为 False 的请求不属于当前页面，翻页时不会被取消（例如详情页的海报）；
+        解码失败时调用 error_callback(异常)。
+        """
+        key = tile_key(poster_path, size, padded)
+        photo = self.cache.lookup(key)
+        if photo is not None:
+            return photo
+
+        self._submit(poster_path, size, key, callback, padded, persist, track, error_callback)
+        return None
+
+    def prefetch(self, poster_paths, size=GRID_SIZE):
+        """预取相邻页面的缩略图到缓存，不触发任何界面更新"""
+        for poster_path in poster_paths:
+            try:
+                key = tile_key(poster_path, size)
+            except OSError:
+                continue
+            if self.cache.lookup(key) is None:
+                self._submit(poster_path, size, key, None)
+
+    def _submit(self, poster_path, size, key, callback, padded=True, persist=True, track=True, error_callback=None):
+        generation = self.generation if track else None
+        future = self.executor.submit(self.cache.get_tile, poster_path, size, padded, persist)
+        future.add_done_callback(lambda f: self._results.put((generation, key, callback, error_callback, f)))
+        if track:
+            self._futures.append(future)
+
+    def _poll(self):
+        """在主线程中处理已完成的解码结果"""
+        while True:
+            try:
+                generation, key, callback, error_callback, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                print(f"后台解码海报失败: {error}")
+                if error_callback is not None and generation in (None, self.generation):
+                    error_callback(error)
+                continue
+
+            # PhotoImage 只能在主线程创建
+            tile = future.result()
+            photo = self.cache.lookup(key)
+            if photo is None:
+                with tracer.stage("photo_create"):
+                    photo = ImageTk.PhotoImage(tile)
+                self.cache.remember(key, photo, tile.width * tile.height * 4)
+
+            # 用户已离开该页面，只保留缓存，不再更新界面
+            if callback is not None and generation in (None, self.generation):
+                try:
+                    callback(photo)
+                except Exception as e:
+                    print(f"更新海报失败: {e}")
+
+        self._futures = [f for f in self._futures if not f.done()]
+        if not self._closed:
+            self._poll_id = self.root.after(POLL_INTERVAL, self._poll)
+
+    def shutdown(self):
+        """停止轮询并取消所有排队中的任务"""
+        self._closed = True
+        self.root.after_cancel(self._poll_id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+"""海报维护（无界面）
+
+用法：
+    python poster_maintenance.py rebuild [--workers 4]        重新生成所有海报的各级预渲染文件
+    python poster_maintenance.py verify [--fix]              检查预渲染文件是否齐全、可解码
+    python poster_maintenance.py gc [--dry-run] [--delete-originals] [--clear-missing]
+                                                             清理无用的缓存文件，报告孤立和缺失的海报
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from bulk_import import POSTERS_DIR, IMAGE_EXTENSIONS
+from poster_cache import PosterCache, PYRAMID_LEVELS, THUMB_DIR
+from storage import open_store, STORAGE_BACKEND
+
+# 程序自带的图片，不属于任何电影，也不会被当作孤立海报
+RESERVED_POSTERS = ("default.png", "star_empty.png", "star_filled.png")
+
+
+def rebuild_poster(poster_path):
+    """在子进程中执行：删除并重新生成一张海报的所有层级"""
+    PosterCache().build_pyramid(poster_path, force=True)
+
+
+def verify_poster(poster_path, fix=False):
+    """在子进程中执行：返回缺失或损坏的层级名称列表，fix 时重新生成"""
+    cache = PosterCache()
+    problems = []
+    for name, (size, padded) in PYRAMID_LEVELS.items():
+        tile_path = cache.cache_file(poster_path, size, padded)
+        try:
+            with Image.open(tile_path) as img:
+                img.load()
+        except FileNotFoundError:
+            problems.append(f"{name} 缺失")
+        except Exception:
+            problems.append(f"{name} 损坏")
+            if fix:
+                os.remove(tile_path)
+    if problems and fix:
+        cache.build_pyramid(poster_path)
+    return problems
+
+
+def load_library(backend):
+    """读取片库摘要，返回 (记录列表, 存在的海报路径列表, 缺失海报的记录列表)"""
+    store = open_store(backend)
+    try:
+        records = list(store.iter_summaries())
+    finally:
+        store.close()
+    posters, missing = [], []
+    for record in records:
+        if record.poster_path and os.path.exists(record.poster_path):
+            posters.append(record.poster_path)
+        else:
+            missing.append(record)
+    return records, sorted(set(posters)), missing
+
+
+def run_parallel(func, poster_paths, workers, *args):
+    """进程池并行处理海报，返回 {海报路径: 结果或异常}"""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {path: executor.submit(func, path, *args) for path in poster_paths}
+        for done, (path, future) in enumerate(futures.items(), 1):
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                results[path] = e
+            print(f"\r正在处理海报 {done}/{len(futures)}", end="", flush=True)
+    if futures:
+        print()
+    return results
+
+
+def cmd_rebuild(args):
+    _, posters, _ = load_library(args.backend)
+    default = os.path.join(POSTERS_DIR, "default.png")
+    if os.path.exists(default):
+        posters.append(default)
+    results = run_parallel(rebuild_poster, posters, args.workers)
+    failed = {path: error for path, error in results.items() if isinstance(error, Exception)}
+    for path, error in failed.items():
+        print(f"生成失败 {path}: {error}")
+    print(f"重新生成完成：{len(results) - len(failed)} 张成功，{len(failed)} 张失败")
+    return 1 if failed else 0
+
+
+def cmd_verify(args):
+    _, posters, missing = load_library(args.backend)
+    results = run_parallel(verify_poster, posters, args.workers, args.fix)
+    bad = {path: problems for path, problems in results.items() if problems}
+    for path, problems in bad.items():
+        text = problems if isinstance(problems, Exception) else "，".join(problems)
+        print(f"{path}: {text}")
+    for record in missing:
+        print(f"《{record.title}》的海报不存在: {record.poster_path or '（未设置）'}")
+    action = "已修复" if args.fix else "有问题"
+    print(f"检查完成：{len(posters)} 张海报，{len(bad)} 张{action}，{len(missing)} 部电影缺少海报")
+    return 1 if (bad and not args.fix) or missing else 0
+
+
+def cmd_gc(args):
+    records, posters, missing = load_library(args.backend)
+    cache = PosterCache()
+    reserved = {os.path.abspath(os.path.join(POSTERS_DIR, name)) for name in RESERVED_POSTERS}
+
+    # 仍被引用的预渲染文件
+    expected = set()
+    for path in posters + sorted(p for p in reserved if os.path.exists(p)):
+        for size, padded in PYRAMID_LEVELS.values():
+            expected.add(os.path.abspath(cache.cache_file(path, size, padded)))
+
+    # 海报已修改或已删除后留下的旧文件，以及中断写入留下的临时文件
+    stale = []
+    for dirpath, _, filenames in os.walk(THUMB_DIR):
+        for name in filenames:
+            path = os.path.abspath(os.path.join(dirpath, name))
+            if path not in expected:
+                stale.append(path)
+    freed = 0
+    for path in stale:
+        freed += os.path.getsize(path)
+        if not args.dry_run:
+            os.remove(path)
+    print(f"{'可清理' if args.dry_run else '已清理'} {len(stale)} 个缓存文件，共 {freed / 1024 / 1024:.1f} MB")
+
+    # 没有任何电影引用的原图
+    referenced = {os.path.abspath(path) for path in posters} | reserved
+    orphans = []
+    for name in sorted(os.listdir(POSTERS_DIR)):
+        path = os.path.abspath(os.path.join(POSTERS_DIR, name))
+        if os.path.isfile(path) and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS and path not in referenced:
+            orphans.append(path)
+    for path in orphans:
+        print(f"孤立海报: {path}")
+        if args.delete_originals and not args.dry_run:
+            os.remove(path)
+    if orphans:
+        print(f"{'已删除' if args.delete_originals and not args.dry_run else '发现'} {len(orphans)} 张孤立海报")
+
+    # 海报文件已不存在的电影
+    for record in missing:
+        print(f"《{record.title}》的海报不存在: {record.poster_path or '（未设置）'}")
+    cleared = [r for r in missing if r.poster_path]
+    if args.clear_missing and cleared and not args.dry_run:
+        for record in cleared:
+            record.poster_path = ""
+        store = open_store(args.backend)
+        try:
+            store.put_many(cleared)
+        finally:
+            store.close()
+        print(f"已清除 {len(cleared)} 部电影的失效海报路径，将显示默认海报")
+    print(f"整理完成：片库共 {len(records)} 部电影")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="重建、检查和清理海报缓存")
+    parser.add_argument("--backend", default=STORAGE_BACKEND, choices=("sqlite", "journal"), help="存储后端")
+    parser.add_argument("--workers", type=int, default=None, help="处理海报的进程数")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("rebuild", help="重新生成所有海报的各级预渲染文件").set_defaults(func=cmd_rebuild)
+
+    verify = sub.add_parser("verify", help="检查预渲染文件是否齐全、可解码")
+    verify.add_argument("--fix", action="store_true", help="重新生成缺失或损坏的文件")
+    verify.set_defaults(func=cmd_verify)
+
+    gc = sub.add_parser("gc", help="清理无用的缓存文件，报告孤立和缺失的海报")
+    gc.add_argument("--dry-run", action="store_true", help="只报告，不删除或修改任何内容")
+    gc.add_argument("--delete-originals", action="store_true", help="删除没有电影引用的原图")
+    gc.add_argument("--clear-missing", action="store_true", help="清除指向不存在文件的海报路径")
+    gc.set_defaults(func=cmd_gc)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+# 可搜索的字段，未指定字段时搜索 DEFAULT_FIELDS
+SEARCH_FIELDS = ("title", "stars", "director", "synopsis")
+DEFAULT_FIELDS = ("title", "stars", "director")
+# 常驻内存并建立倒排表的字段；其余字段（如剧情简介）按需到存储中查询
+INDEXED_FIELDS = ("title", "stars", "director")
+# 字段别名，支持 "主演:xxx" 这样的写法
+FIELD_ALIASES = {
+    "标题": "title",
+    "主演": "stars",
+    "导演": "director",
+    "简介": "synopsis",
+}
+# 倒排索引的 n-gram 长度
+GRAM_SIZES = (2, 3)
+# 缓存的详情字段查询结果数（每个结果是一组电影 id）
+DETAIL_CACHE_SIZE = 8
+
+# 评分过滤条件，如 level>=4、level:5
+LEVEL_PATTERN = re.compile(r"^(?:level|评分)(>=|<=|>|<|=|:)(\d+(?:\.\d+)?)$")
+
+
+def normalize(text):
+    """统一全角/半角和大小写，索引和查询都使用同一规则"""
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def parse_level(movie):
+    try:
+        return float(movie.get("level") or 0)
+    except ValueError:
+        return 0.0
+
+
+class SearchIndex:
+    """内存搜索索引：预先规范化字段，并为每个字段建立 n-gram 倒排表
+
+    detail_search(field, term) 用于查询未常驻内存的详情字段，返回匹配的电影 id 集合；
+    未提供时直接扫描记录。查询结果按 (字段, 查询词) 缓存，之后随记录的增删改增量维护，
+    同一个词不会重复查询存储。
+    """
+
+    def __init__(self, movies=(), detail_search=None):
+        self._docs = {}  # key -> (movie, {field: 规范化文本}, level)
+        self._postings = {field: defaultdict(set) for field in INDEXED_FIELDS}
+        self.detail_search = detail_search
+        self._detail_cache = {}  # (field, term) -> 匹配的电影键集合
+        self.detail_version = 0  # 每次可能影响详情查询结果的修改加一
+        for movie in movies:
+            self.add(movie)
+
+    @staticmethod
+    def key(movie):
+        return movie["id"]
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, movie_id):
+        return movie_id in self._docs
+
+    def add(self, movie):
+        """加入一部电影，已存在时先移除旧的索引项"""
+        key = self.key(movie)
+        is_new = key not in self._docs
+        if not is_new:
+            self.remove(movie)
+        self._update_details(key, movie, is_new)
+
+        fields = {field: normalize(movie.get(field, "")) for field in INDEXED_FIELDS}
+        self._docs[key] = (movie, fields, parse_level(movie))
+        for field, text in fields.items():
+            postings = self._postings[field]
+            for n in GRAM_SIZES:
+                for gram in ngrams(text, n):
+                    postings[gram].add(key)
+
+    def remove(self, movie):
+        """从索引中移除一部电影"""
+        key = self.key(movie)
+        entry = self._docs.pop(key, None)
+        if entry is None:
+            return
+        for field, text in entry[1].items():
+            postings = self._postings[field]
+            for n in GRAM_SIZES:
+                for gram in ngrams(text, n):
+                    keys = postings.get(gram)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del postings[gram]
+
+    def update(self, movie):
+        """电影信息修改后重新建立索引"""
+        self.add(movie)
+
+    def _update_details(self, key, movie, is_new):
+        """按记录的详情字段更新缓存的查询结果"""
+        if self.detail_search is None:
+            return
+        if not getattr(movie, "details_loaded", True):
+            # 只有摘要的记录：已有记录的详情没有变化；新记录（如批量导入）无法判断，清空缓存
+            if is_new:
+                self._detail_cache.clear()
+                self.detail_version += 1
+            return
+        self.detail_version += 1
+        for (field, term), keys in self._detail_cache.items():
+            if term in normalize(str(movie.get(field, ""))):
+                keys.add(key)
+            else:
+                keys.discard(key)
+
+    def _candidates(self, field, term):
+        """通过倒排表找出可能包含 term 的电影，无法利用索引时返回 None"""
+        n = max((size for size in GRAM_SIZES if size <= len(term)), default=0)
+        if n == 0:
+            return None
+
+        postings = self._postings[field]
+        result = None
+        for gram in sorted(ngrams(term, n), key=lambda g: len(postings.get(g, ()))):
+            keys = postings.get(gram)
+            if not keys:
+                return set()
+            result = set(keys) if result is None else result & keys
+            if not result:
+                break
+        return result
+
+    def _match_term(self, fields, term):
+        """匹配单个查询词，返回满足条件的电影键集合"""
+        matched = set()
+        for field in fields:
+            if field not in INDEXED_FIELDS:
+                matched.update(self._match_detail(field, term))
+                continue
+            candidates = self._candidates(field, term)
+            if candidates is None:
+                candidates = self._docs.keys()
+            # n-gram 只能缩小范围，最终仍需确认是连续子串
+            matched.update(key for key in candidates if term in self._docs[key][1][field])
+        return matched
+
+    def _match_detail(self, field, term):
+        if self.detail_search is not None:
+            keys = self._detail_cache.get((field, term))
+            if keys is None:
+                keys = self.detail_search(field, term)
+                self.store_details(field, term, keys, self.detail_version)
+            return keys & self._docs.keys()
+        return {key for key, (movie, _, _) in self._docs.items()
+                if term in normalize(str(movie.get(field, "")))}
+
+    def _match_level(self, op, value):
+        compare = {
+            ">=": lambda level: level >= value,
+            "<=": lambda level: level <= value,
+            ">": lambda level: level > value,
+            "<": lambda level: level < value,
+            "=": lambda level: level == value,
+            ":": lambda level: level == value,
+        }[op]
+        return {key for key, (_, _, level) in self._docs.items() if compare(level)}
+
+    def store_details(self, field, term, keys, version):
+        """缓存详情字段的查询结果（可由后台线程查询）；查询开始后记录有变化时丢弃，返回是否已缓存"""
+        if version != self.detail_version:
+            return False
+        self._detail_cache.pop((field, term), None)
+        self._detail_cache[(field, term)] = set(keys)
+        while len(self._detail_cache) > DETAIL_CACHE_SIZE:
+            del self._detail_cache[next(iter(self._detail_cache))]
+        return True
+
+    def pending_details(self, query):
+        """返回查询中需要到存储中查找、且尚未缓存的 (字段, 查询词) 列表"""
+        if self.detail_search is None:
+            return []
+        pending = []
+        for token in self._parse(query):
+            if token[0] == "term":
+                for field in token[1]:
+                    if (field not in INDEXED_FIELDS and (field, token[2]) not in self._detail_cache
+                            and (field, token[2]) not in pending):
+                        pending.append((field, token[2]))
+        return pending
+
+    @staticmethod
+    def _parse(query):
+        """把查询拆分为 ("level", 比较符, 数值) 或 ("term", 字段元组, 规范化的查询词)"""
+        for token in query.split():
+            level_match = LEVEL_PATTERN.match(normalize(token))
+            if level_match:
+                yield "level", level_match.group(1), float(level_match.group(2))
+                continue
+            field, sep, value = token.partition(":")
+            field = FIELD_ALIASES.get(field, normalize(field))
+            if sep and field in SEARCH_FIELDS and value:
+                yield "term", (field,), normalize(value)
+            else:
+                yield "term", DEFAULT_FIELDS, normalize(token)
+
+    def search(self, query):
+        """返回匹配查询的电影键集合。多个条件之间为“与”关系，例如：
+
+        IPZZ-            标题/主演/导演中包含 IPZZ-
+        stars:yuuka      主演包含 yuuka
+        synopsis:好听    剧情简介包含“好听”
+        level>=4         评分不低于 4
+        """
+        result = None
+        for kind, arg, value in self._parse(query):
+            if kind == "level":
+                keys = self._match_level(arg, value)
+            else:
+                keys = self._match_term(arg, value)
+
+            result = keys if result is None else result & keys
+            if not result:
+                return set()
+        return set(self._docs) if result is None else result
+
+    def filter(self, movies, query):
+        """在 movies 中筛选匹配的电影，保持原有顺序，不修改 movies 本身"""
+        if not query.strip():
+            return movies
+        keys = self.search(query)
+        return [movie for movie in movies if self.key(movie) in keys]
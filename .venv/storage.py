@@ -0,0 +1,475 @@
+import os
+import json
+import uuid
+import sqlite3
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from movie_record import MovieRecord, SUMMARY_FIELDS, DETAIL_FIELDS
+from search_index import normalize
+from perf_trace import tracer
+
+# 存储后端：sqlite（默认）或 journal（追加式 JSON Lines 日志）
+STORAGE_BACKEND = os.environ.get("VIDEOSTORE_BACKEND", "sqlite")
+# 各后端的数据文件（使用绝对路径）
+DB_FILE = os.path.abspath("movies.db")
+JOURNAL_FILE = os.path.abspath("movies.jsonl")
+# 旧版整文件 JSON，首次启动时自动迁移，迁移成功后改名，不会再次导入
+LEGACY_FILE = os.path.abspath("movies.json")
+MIGRATED_SUFFIX = ".migrated"
+# 日志后端的摘要索引文件（日志路径加后缀），压缩和关闭时写入，启动时只需重放其后追加的日志行
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+# 校验索引是否与日志对应时比较的日志字节数（索引覆盖范围的末尾部分）
+INDEX_CHECK_BYTES = 4096
+
+# 批量写入的合并延迟（毫秒）
+FLUSH_DELAY = 500
+
+
+def new_movie_id():
+    return uuid.uuid4().hex
+
+
+def ensure_id(movie):
+    """为没有 id 的记录分配唯一 id"""
+    if not movie.get("id"):
+        movie["id"] = new_movie_id()
+    return movie["id"]
+
+
+def split_record(movie):
+    """拆分为（摘要字段, 详情字段）；MovieRecord 详情未加载时详情为 None"""
+    if isinstance(movie, MovieRecord):
+        details = movie.ensure_details() if movie.details_loaded else None
+        return movie.summary(), details
+    summary = {"id": movie["id"]}
+    summary.update((f, str(movie.get(f) or "")) for f in SUMMARY_FIELDS)
+    details = {k: v for k, v in movie.items()
+               if k != "id" and k not in SUMMARY_FIELDS}
+    return summary, details
+
+
+def atomic_write_bytes(path, data):
+    """先写临时文件并 fsync，再原子替换目标文件，避免写到一半时崩溃导致文件被截断
+
+    以二进制方式写入，Windows 上也不会把 \n 转换为 \r\n（日志的偏移量依赖原始字节）。
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def atomic_write_text(path, text):
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+class MovieStore(ABC):
+    """存储后端基类：按 id 增量写入，不再整文件重写"""
+
+    @abstractmethod
+    def iter_summaries(self):
+        """按添加顺序逐条返回只含摘要字段的 MovieRecord，详情在访问时才加载"""
+
+    @abstractmethod
+    def load_details(self, movie_id):
+        """读取一部电影的详情字段"""
+
+    @abstractmethod
+    def search_details(self, field, term):
+        """返回详情字段规范化后包含 term 的电影 id 集合；可在后台线程中调用"""
+        """返回详情字段 field 中包含 term（已规范化）的电影 id 集合"""
+
+    @abstractmethod
+    def put_many(self, movies):
+        """新增或更新多条记录（一次事务）"""
+
+    @abstractmethod
+    def delete_many(self, movie_ids):
+        """删除多条记录（一次事务）"""
+
+    @abstractmethod
+    def is_empty(self):
+        """库中是否没有任何电影"""
+
+    def close(self):
+        pass
+
+    def migrate_from_json(self, path=LEGACY_FILE):
+        """从旧版 movies.json 导入数据，成功后把文件改名为 movies.json.migrated，返回导入条数"""
+        with open(path, "r", encoding="utf-8") as f:
+            movies = json.load(f)
+        for movie in movies:
+            ensure_id(movie)
+        self.put_many(movies)
+        # 改名即迁移完成的标记：之后即使删光所有电影，也不会再把旧数据导入回来
+        os.replace(path, path + MIGRATED_SUFFIX)
+        print(f"已从 {path} 迁移 {len(movies)} 部电影")
+        return len(movies)
+
+
+class SQLiteStore(MovieStore):
+    """SQLite 后端：每部电影一行，常用字段建立索引"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.conn = self._connect()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS movies (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL DEFAULT '',
+                    poster_path TEXT NOT NULL DEFAULT '',
+                    stars TEXT NOT NULL DEFAULT '',
+                    director TEXT NOT NULL DEFAULT '',
+                    level TEXT NOT NULL DEFAULT '',
+                    type TEXT NOT NULL DEFAULT '',
+                    region TEXT NOT NULL DEFAULT '',
+                    download_link TEXT NOT NULL DEFAULT '',
+                    watch_link TEXT NOT NULL DEFAULT '',
+                    synopsis TEXT NOT NULL DEFAULT '',
+                    extra TEXT NOT NULL DEFAULT '{}'
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_title ON movies(title)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_level ON movies(level)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        # 与内存搜索索引使用相同的规范化规则
+        conn.create_function("normalize", 1, normalize, deterministic=True)
+        return conn
+
+    def iter_summaries(self, batch_size=1000):
+        cursor = self.conn.execute(
+            f"SELECT id, {', '.join(SUMMARY_FIELDS)} FROM movies ORDER BY seq")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield MovieRecord(*row, loader=self.load_details)
+
+    def load_details(self, movie_id):
+        row = self.conn.execute(
+            f"SELECT {', '.join(DETAIL_FIELDS)}, extra FROM movies WHERE id = ?", (movie_id,)).fetchone()
+        if row is None:
+            return {}
+        details = dict(zip(DETAIL_FIELDS, row[:-1]))
+        details.update(json.loads(row[-1]))
+        return details
+
+    def search_details(self, field, term):
+        if field not in DETAIL_FIELDS:
+            return set()
+        # 使用单独的连接：连接不能跨线程共享，WAL 模式下读取也不会阻塞主线程的写入
+        conn = self._connect()
+        try:
+            cursor = conn.execute(f"SELECT id FROM movies WHERE instr(normalize({field}), ?) > 0", (term,))
+            return {row[0] for row in cursor}
+        finally:
+            conn.close()
+
+    def put_many(self, movies):
+        summary_columns = ("id",) + SUMMARY_FIELDS
+        full_columns = summary_columns + DETAIL_FIELDS + ("extra",)
+        full_rows, summary_rows = [], []
+        for movie in movies:
+            summary, details = split_record(movie)
+            row = tuple(summary[c] for c in summary_columns)
+            if details is None:
+                # 详情未加载，只更新摘要字段，保留库中的详情
+                summary_rows.append(row)
+            else:
+                extra = {k: v for k, v in details.items() if k not in DETAIL_FIELDS}
+                full_rows.append(row + tuple(str(details.get(f) or "") for f in DETAIL_FIELDS)
+                                 + (json.dumps(extra, ensure_ascii=False),))
+
+        with self.conn:
+            for columns, rows in ((full_columns, full_rows), (summary_columns, summary_rows)):
+                if rows:
+                    updates = ", ".join(f"{c}=excluded.{c}" for c in columns[1:])
+                    self.conn.executemany(
+                        f"INSERT INTO movies ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                        f"ON CONFLICT(id) DO UPDATE SET {updates}", rows)
+
+    def delete_many(self, movie_ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM movies WHERE id = ?", [(i,) for i in movie_ids])
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM movies LIMIT 1").fetchone() is None
+
+    def close(self):
+        self.conn.close()
+
+
+class JournalStore(MovieStore):
+    """追加式日志后端：每次修改追加一行，日志膨胀后压缩为只含当前记录的快照
+
+    内存中只保留每部电影的摘要和其最新日志行的偏移量，详情按偏移量读取。
+    摘要和偏移量在压缩和关闭时另存为索引文件，启动时读取索引，只重放之后追加的日志行。
+    """
+
+    def __init__(self, path=JOURNAL_FILE, compact_ratio=2.0, compact_min=200):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._index_end = None  # 索引文件覆盖到的日志位置
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._index = {}  # id -> (摘要元组, 行偏移量)，保持添加顺序
+        self._entries = 0  # 日志中的行数
+        self._searches = 0  # 正在后台读取日志的查询数，期间不自动压缩
+        self._lock = threading.Lock()
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        offset = valid_end = self._load_index()
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                line_offset, offset = offset, offset + len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 崩溃时可能留下不完整的最后一行，直接忽略
+                    print(f"忽略损坏的日志行 {self.path} @ {line_offset}")
+                    continue
+                if not line.endswith(b"\n"):
+                    continue
+                valid_end = offset
+                self._entries += 1
+                if entry.get("op") == "delete":
+                    self._index.pop(entry["id"], None)
+                else:
+                    movie = entry["movie"]
+                    summary = tuple(movie.get(f, "") for f in SUMMARY_FIELDS)
+                    self._index[movie["id"]] = (summary, line_offset)
+
+        if valid_end < offset:
+            # 截掉末尾不完整的内容，避免之后追加的行与其粘连
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def _checksum(self, end):
+        """日志在 end 之前最后 INDEX_CHECK_BYTES 字节的校验和"""
+        with open(self.path, "rb") as f:
+            f.seek(max(0, end - INDEX_CHECK_BYTES))
+            return zlib.crc32(f.read(end - f.tell()))
+
+    def _load_index(self):
+        """读取索引文件，返回它覆盖到的日志位置；没有索引或索引与日志不符时返回 0（完整重放）"""
+        try:
+            with open(self.index_path, "rb") as f:
+                data = json.loads(f.read())
+            end = data["end"]
+            if (data["version"] != INDEX_VERSION or os.path.getsize(self.path) < end
+                    or self._checksum(end) != data["checksum"]):
+                print(f"索引与日志不符，重新读取整个日志 {self.path}")
+                return 0
+            self._index = {row[0]: (tuple(row[2:]), row[1]) for row in data["movies"]}
+            self._entries = data["entries"]
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError, TypeError, IndexError):
+            print(f"忽略损坏的索引文件 {self.index_path}")
+            self._index, self._entries = {}, 0
+            return 0
+        self._index_end = end
+        return end
+
+    def _write_index(self):
+        """把当前的摘要和偏移量写入索引文件"""
+        end = os.path.getsize(self.path)
+        data = {"version": INDEX_VERSION, "end": end, "checksum": self._checksum(end), "entries": self._entries,
+                "movies": [[movie_id, offset, *summary] for movie_id, (summary, offset) in self._index.items()]}
+        atomic_write_text(self.index_path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        self._index_end = end
+
+    def _read_movie(self, f, offset):
+        f.seek(offset)
+        return json.loads(f.readline())["movie"]
+
+    def iter_summaries(self):
+        for movie_id, (summary, _) in list(self._index.items()):
+            yield MovieRecord(movie_id, *summary, loader=self.load_details)
+
+    def load_details(self, movie_id):
+        entry = self._index.get(movie_id)
+        if entry is None:
+            return {}
+        with open(self.path, "rb") as f:
+            movie = self._read_movie(f, entry[1])
+        return {k: v for k, v in movie.items() if k != "id" and k not in SUMMARY_FIELDS}
+
+    def search_details(self, field, term):
+        # 按调用时的索引快照读取；之后追加的行不影响这些偏移量，压缩则推迟到查询结束
+        with self._lock:
+            self._searches += 1
+            entries = list(self._index.items())
+        try:
+            found = set()
+            with open(self.path, "rb") as f:
+                for movie_id, (_, offset) in entries:
+                    if term in normalize(str(self._read_movie(f, offset).get(field, ""))):
+                        found.add(movie_id)
+            return found
+        finally:
+            with self._lock:
+                self._searches -= 1
+
+    def _append(self, entries):
+        """追加日志行，返回每行的偏移量"""
+        offsets = []
+        with open(self.path, "ab") as f:
+            for entry in entries:
+                offsets.append(f.tell())
+                f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        self._entries += len(entries)
+        return offsets
+
+    def _maybe_compact(self):
+        with self._lock:
+            if not self._searches and self._entries > max(self.compact_min, len(self._index) * self.compact_ratio):
+                self.compact()
+
+    def compact(self):
+        """把日志重写为当前所有记录的快照（原子替换）"""
+        lines, index, offset = [], {}, 0
+        with open(self.path, "rb") as f:
+            for movie_id, (summary, old_offset) in self._index.items():
+                f.seek(old_offset)
+                line = f.readline()
+                lines.append(line)
+                index[movie_id] = (summary, offset)
+                offset += len(line)
+        # 先删除旧索引：替换日志后、写入新索引前崩溃时，下次启动完整重放
+        try:
+            os.remove(self.index_path)
+        except FileNotFoundError:
+            pass
+        self._index_end = None
+        atomic_write_bytes(self.path, b"".join(lines))
+        self._index = index
+        self._entries = len(lines)
+        self._write_index()
+
+    def put_many(self, movies):
+        entries = []
+        for movie in movies:
+            summary, details = split_record(movie)
+            if details is None:
+                # 日志行必须是完整记录，先补齐详情
+                details = self.load_details(summary["id"])
+            record = dict(details)
+            record.update(summary)
+            entries.append({"op": "put", "movie": record})
+
+        offsets = self._append(entries)
+        for entry, offset in zip(entries, offsets):
+            movie = entry["movie"]
+            self._index[movie["id"]] = (tuple(movie[f] for f in SUMMARY_FIELDS), offset)
+        self._maybe_compact()
+
+    def delete_many(self, movie_ids):
+        self._append([{"op": "delete", "id": movie_id} for movie_id in movie_ids])
+        for movie_id in movie_ids:
+            self._index.pop(movie_id, None)
+        self._maybe_compact()
+
+    def is_empty(self):
+        return not self._index
+
+    def close(self):
+        if self._entries > len(self._index):
+            self.compact()
+        elif os.path.exists(self.path) and self._index_end != os.path.getsize(self.path):
+            self._write_index()
+
+
+def open_store(backend=STORAGE_BACKEND, path=None, legacy_path=LEGACY_FILE):
+    """打开存储后端；库为空且存在尚未迁移的 movies.json 时自动迁移
+
+    返回的存储对象带有 first_run 属性：数据文件此前不存在且没有可迁移的旧数据，
+    即真正的首次启动（界面据此决定是否写入示例电影）。
+    """
+    if backend == "journal":
+        path = path or JOURNAL_FILE
+        created = not os.path.exists(path)
+        store = JournalStore(path)
+    else:
+        path = path or DB_FILE
+        created = not os.path.exists(path)
+        store = SQLiteStore(path)
+
+    migrated = False
+    if store.is_empty() and os.path.exists(legacy_path):
+        store.migrate_from_json(legacy_path)
+        migrated = True
+    store.first_run = created and not migrated
+    return store
+
+
+class BatchWriter:
+    """合并短时间内的多次修改，定时一次性写入存储"""
+
+    def __init__(self, root, store, delay=FLUSH_DELAY, on_error=None):
+        self.root = root
+        self.store = store
+        self.delay = delay
+        self.on_error = on_error
+        self._dirty = {}  # id -> 记录，同一记录多次修改只写最后一次
+        self._deleted = set()
+        self._job = None
+
+    def put(self, movie):
+        movie_id = ensure_id(movie)
+        self._deleted.discard(movie_id)
+        self._dirty[movie_id] = movie
+        self._schedule()
+
+    def delete(self, movie):
+        movie_id = movie.get("id")
+        if not movie_id:
+            return
+        self._dirty.pop(movie_id, None)
+        self._deleted.add(movie_id)
+        self._schedule()
+
+    def _schedule(self):
+        if self._job is None:
+            self._job = self.root.after(self.delay, self.flush)
+
+    def flush(self):
+        """立即写入所有待保存的修改，返回是否成功"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+        dirty, deleted = self._dirty, self._deleted
+        self._dirty, self._deleted = {}, set()
+        try:
+            with tracer.stage("storage_write"):
+                if dirty:
+                    self.store.put_many(list(dirty.values()))
+                if deleted:
+                    self.store.delete_many(list(deleted))
+            return True
+        except Exception as e:
+            # 写入失败时保留修改，下次再试
+            dirty.update(self._dirty)
+            self._dirty = dirty
+            self._deleted |= deleted
+            print(f"保存电影数据失败: {e}")
+            if self.on_error:
+                self.on_error(e)
+            return False
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 模块与 main_page.py 平铺在同一目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import os
+
+from PIL import Image
+
+from bulk_import import BulkImporter, read_manifest
+
+
+def make_image(path, color):
+    Image.new("RGB", (60, 90), color).save(path)
+    return str(path)
+
+
+def item(title, source):
+    return {"title": title, "source": source, "stars": "", "director": "", "type": "", "region": "",
+            "level": "", "download_link": "", "watch_link": "", "synopsis": ""}
+
+
+def test_posters_never_overwrite_existing_or_each_other(tmp_path):
+    posters = tmp_path / "posters"
+    posters.mkdir()
+    # 改名后的电影仍引用旧文件名 A_B.jpg
+    existing = make_image(posters / "A_B.jpg", (1, 2, 3))
+    original = open(existing, "rb").read()
+    # 片库中引用但文件已丢失的路径也不能被占用
+    missing = str(posters / "C.jpg")
+
+    importer = BulkImporter(existing_posters=[existing, missing], posters_dir=str(posters), max_workers=1,
+                            cache_dir=str(tmp_path / "thumbs"))
+    result = importer.run([
+        item("A:B", make_image(tmp_path / "1.png", (200, 0, 0))),
+        item("A?B", make_image(tmp_path / "2.png", (0, 200, 0))),
+        item("C", make_image(tmp_path / "3.png", (0, 0, 200))),
+        item("无海报", ""),
+    ])
+
+    paths = [movie["poster_path"] for movie in result.movies]
+    assert len(paths) == 4 and not result.failed
+    assert len(set(paths[:3])) == 3
+    assert existing not in paths and missing not in paths
+    assert all(os.path.exists(path) for path in paths[:3])
+    assert paths[3] == ""
+    assert open(existing, "rb").read() == original
+
+
+def test_invalid_level_is_reported_as_failed(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("title,level\n空评分,\n整数,4\n小数, 8.6 \n不适用,N/A\n星号,★★★\n非数,nan\n",
+                        encoding="utf-8")
+    importer = BulkImporter(posters_dir=str(tmp_path / "posters"), max_workers=1,
+                            cache_dir=str(tmp_path / "thumbs"))
+    result = importer.run(read_manifest(str(manifest)))
+
+    assert [(movie["title"], movie["level"]) for movie in result.movies] == [("空评分", ""), ("整数", "4"),
+                                                                           ("小数", "8.6")]
+    assert [title for title, _ in result.failed] == ["不适用", "星号", "非数"]
+    assert "N/A" in result.failed[0][1]
@@ -0,0 +1,61 @@
+import pytest
+
+from catalog import Catalog
+
+
+def movie(movie_id, title="", level=""):
+    return {"id": movie_id, "title": title or f"电影{movie_id}", "poster_path": "", "stars": "", "level": level}
+
+
+def test_extend_skips_existing_ids_and_sends_one_event():
+    catalog = Catalog([movie("a")])
+    events = []
+    catalog.subscribe(lambda event, records: events.append((event, [r["id"] for r in records])))
+
+    added = catalog.extend([movie("a"), movie("b"), movie("c")])
+    assert [r["id"] for r in added] == ["b", "c"]
+    assert events == [("add", ["b", "c"])]
+    assert catalog.extend([movie("b")]) == []
+    assert len(events) == 1
+
+
+def test_ordered_is_cached_until_membership_changes():
+    catalog = Catalog([movie("a"), movie("b")])
+    ordered = catalog.ordered()
+    assert catalog.ordered() is ordered
+
+    catalog.update("a", title="新标题")
+    assert catalog.ordered() is ordered
+    assert ordered[0]["title"] == "新标题"
+
+    catalog.delete("a")
+    assert [r["id"] for r in catalog.ordered()] == ["b"]
+    assert [r["id"] for r in ordered] == ["a", "b"]  # 旧列表不被修改
+
+
+def test_update_and_delete_events():
+    catalog = Catalog([movie("a")])
+    events = []
+    unsubscribe = catalog.subscribe(lambda event, records: events.append((event, records[0]["level"])))
+
+    record = catalog.update("a", level="4")
+    assert record is catalog.get("a")
+    assert catalog.delete("missing") is None
+    assert catalog.delete("a")["id"] == "a"
+    assert "a" not in catalog
+    assert events == [("update", "4"), ("delete", "4")]
+
+    unsubscribe()
+    catalog.add(movie("b"))
+    assert len(events) == 2
+    with pytest.raises(KeyError):
+        catalog.update("a", level="1")
+
+
+def test_failing_listener_does_not_block_others():
+    catalog = Catalog()
+    seen = []
+    catalog.subscribe(lambda event, records: 1 / 0)
+    catalog.subscribe(lambda event, records: seen.append(event))
+    catalog.add(movie("a"))
+    assert seen == ["add"]
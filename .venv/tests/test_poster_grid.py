@@ -0,0 +1,68 @@
+import types
+
+import pytest
+
+import poster_grid
+from catalog import Catalog
+from poster_grid import PosterGrid
+
+
+def movie(movie_id):
+    return {"id": movie_id, "title": f"电影{movie_id}", "poster_path": "", "stars": "", "level": ""}
+
+
+class StubWidget:
+    """代替 ttk 控件：接受任何参数，所有方法都不做事"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StubLoader:
+    def new_generation(self):
+        pass
+
+    def request(self, poster_path, callback, **kwargs):
+        return "photo"
+
+
+@pytest.fixture
+def grid(monkeypatch):
+    monkeypatch.setattr(poster_grid, "ttk", types.SimpleNamespace(Frame=StubWidget, Label=StubWidget))
+    catalog = Catalog([movie(str(i)) for i in range(6)])
+    app = types.SimpleNamespace(catalog=catalog, use_image_stars=False, poster_loader=StubLoader(),
+                                load_poster_image=lambda path: None, resolve_poster_path=lambda path: path)
+    return PosterGrid(app, StubWidget())
+
+
+def shown(grid):
+    return {tile.movie["id"]: tile for tile in grid.tiles if tile.movie is not None}
+
+
+def test_bindings_survive_delete_shift(grid):
+    catalog = grid.app.catalog
+    grid.render(catalog.ordered(), 3, 2)
+    assert grid.bindings == shown(grid)
+
+    catalog.delete("0")
+    grid.render(catalog.ordered(), 3, 2)
+    assert sorted(grid.bindings) == ["1", "2", "3", "4", "5"]
+    assert grid.bindings == shown(grid)
+
+    # 修改可见电影时只重新绑定显示它的卡片
+    catalog.update("3", title="改名")
+    assert grid.bindings["3"].movie["title"] == "改名"
+
+
+def test_bindings_survive_row_step(grid):
+    catalog = grid.app.catalog
+    catalog.extend([movie(str(i)) for i in range(6, 12)])
+    movies = catalog.ordered()
+    grid.render(movies[0:6], 3, 2)
+    # 连续滚动下移一行：后一行的电影移到前一行的卡片上
+    grid.render(movies[3:9], 3, 2)
+    assert sorted(grid.bindings, key=int) == [str(i) for i in range(3, 9)]
+    assert grid.bindings == shown(grid)
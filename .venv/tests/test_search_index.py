@@ -0,0 +1,140 @@
+from movie_record import MovieRecord
+from search_index import SearchIndex
+
+
+def movie(movie_id, title, stars="", director="", level="", synopsis=""):
+    return {"id": movie_id, "title": title, "stars": stars, "director": director, "level": level,
+            "synopsis": synopsis}
+
+
+MOVIES = [
+    movie("1", "IPZZ-101 夏天", stars="河合明日菜", director="岩井俊二", level="5", synopsis="好听的音乐"),
+    movie("2", "ipzz-202", stars="三上悠亚", level="4"),
+    movie("3", "SONE-303 海边", stars="河合明日菜, 新垣结衣", director="饺子", level="3.5"),
+    movie("4", "Ａ", stars="石原里美", level=""),
+]
+
+
+def ids(movies):
+    return [m["id"] for m in movies]
+
+
+def make_index():
+    return SearchIndex(MOVIES)
+
+
+def test_title_substring_uses_ngrams_and_normalizes_case():
+    index = make_index()
+    assert index.search("IPZZ-") == {"1", "2"}
+    assert index.search("ipzz-2") == {"2"}
+    assert index.search("ZZ-1") == {"1"}
+
+
+def test_field_prefix_and_aliases():
+    index = make_index()
+    assert index.search("stars:河合") == {"1", "3"}
+    assert index.search("主演:新垣") == {"3"}
+    assert index.search("director:饺子") == {"3"}
+    assert index.search("synopsis:音乐") == {"1"}
+    # 不认识的字段名当作普通查询词
+    assert index.search("foo:bar") == set()
+
+
+def test_level_filters():
+    index = make_index()
+    assert index.search("level>=4") == {"1", "2"}
+    assert index.search("level<4") == {"3", "4"}
+    assert index.search("评分:5") == {"1"}
+    assert index.search("level>=3 stars:河合") == {"1", "3"}
+
+
+def test_single_character_queries_scan_without_ngrams():
+    index = make_index()
+    assert index.search("夏") == {"1"}
+    assert index.search("a") == {"4"}  # 全角 Ａ 规范化后匹配
+    assert index.search("河") == {"1", "3"}
+
+
+def test_terms_are_and_combined():
+    index = make_index()
+    assert index.search("IPZZ 河合") == {"1"}
+    assert index.search("IPZZ 不存在") == set()
+
+
+def test_filter_keeps_order_and_returns_same_list_for_empty_query():
+    index = make_index()
+    movies = list(reversed(MOVIES))
+    assert index.filter(movies, "   ") is movies
+    assert ids(index.filter(movies, "河合")) == ["3", "1"]
+
+
+def test_remove_and_update():
+    index = make_index()
+    index.remove(MOVIES[0])
+    assert "1" not in index
+    assert index.search("IPZZ-") == {"2"}
+    assert index.search("夏天") == set()
+
+    changed = dict(MOVIES[1], title="NEW-999", level="1")
+    index.update(changed)
+    assert len(index) == 3
+    assert index.search("IPZZ") == set()
+    assert index.search("NEW-9") == {"2"}
+    assert index.search("level>=4") == set()
+
+    # 移除不存在的电影不报错
+    index.remove(MOVIES[0])
+
+
+def test_detail_search_callback_is_limited_to_indexed_movies():
+    calls = []
+
+    def detail_search(field, term):
+        calls.append((field, term))
+        return {"1", "999"}
+
+    index = SearchIndex(MOVIES, detail_search=detail_search)
+    assert index.search("简介:好听") == {"1"}
+    assert calls == [("synopsis", "好听")]
+
+
+def test_detail_results_are_cached_and_kept_up_to_date():
+    calls = []
+
+    def detail_search(field, term):
+        calls.append((field, term))
+        return {m["id"] for m in MOVIES if term in m["synopsis"]}
+
+    index = SearchIndex(MOVIES, detail_search=detail_search)
+    assert index.pending_details("IPZZ synopsis:音乐 level>=1") == [("synopsis", "音乐")]
+    assert index.search("synopsis:音乐") == {"1"}
+    assert index.search("synopsis:音乐 IPZZ") == {"1"}
+    assert calls == [("synopsis", "音乐")]
+    assert index.pending_details("synopsis:音乐") == []
+
+    # 修改详情后按新内容更新缓存，不再查询存储
+    index.update(dict(MOVIES[1], synopsis="也有音乐"))
+    index.update(dict(MOVIES[0], synopsis="没有了"))
+    assert index.search("synopsis:音乐") == {"2"}
+    assert len(calls) == 1
+
+
+def test_detail_results_from_before_a_change_are_dropped():
+    index = SearchIndex(MOVIES, detail_search=lambda field, term: set())
+    version = index.detail_version
+    index.update(dict(MOVIES[1], synopsis="音乐"))
+    assert not index.store_details("synopsis", "音乐", set(), version)
+    assert index.pending_details("synopsis:音乐") == [("synopsis", "音乐")]
+    assert index.store_details("synopsis", "音乐", {"2"}, index.detail_version)
+    assert index.search("synopsis:音乐") == {"2"}
+
+
+def test_new_summary_only_record_clears_detail_cache():
+    index = SearchIndex(MOVIES, detail_search=lambda field, term: {"1"})
+    assert index.search("synopsis:音乐") == {"1"}
+    index.add(MovieRecord("5", "新电影", loader=lambda movie_id: {"synopsis": "音乐"}))
+    assert index.pending_details("synopsis:音乐") == [("synopsis", "音乐")]
+    # 已有记录只改摘要字段时详情不变，缓存保留
+    assert index.search("synopsis:音乐") == {"1"}
+    index.update(MovieRecord("5", "改名", loader=lambda movie_id: {"synopsis": "音乐"}))
+    assert index.pending_details("synopsis:音乐") == []
@@ -0,0 +1,228 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from movie_record import MovieRecord
+from storage import JournalStore, SQLiteStore, BatchWriter, MovieStore, open_store
+
+
+def movie(movie_id, title, **extra):
+    data = {"id": movie_id, "title": title, "poster_path": "", "stars": "", "director": "", "level": ""}
+    data.update(extra)
+    return data
+
+
+def titles(store):
+    return [record.title for record in store.iter_summaries()]
+
+
+def test_store_base_is_abstract():
+    with pytest.raises(TypeError):
+        MovieStore()
+
+
+def test_journal_replay_keeps_order_updates_and_deletes(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    store = JournalStore(str(path), compact_min=1000)
+    store.put_many([movie("a", "A", synopsis="aaa"), movie("b", "B"), movie("c", "C")])
+    store.put_many([movie("a", "A2", synopsis="new")])
+    store.delete_many(["b"])
+
+    reopened = JournalStore(str(path), compact_min=1000)
+    assert titles(reopened) == ["A2", "C"]
+    assert reopened.load_details("a")["synopsis"] == "new"
+    assert reopened.load_details("b") == {}
+
+
+def test_journal_truncates_torn_last_line(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    store = JournalStore(str(path))
+    store.put_many([movie("a", "A")])
+    valid_size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"op": "put", "movie": {"id": "b", "ti')
+
+    reopened = JournalStore(str(path))
+    assert titles(reopened) == ["A"]
+    assert path.stat().st_size == valid_size
+
+    # 截断后追加的行不会与残留内容粘连
+    reopened.put_many([movie("c", "C")])
+    assert titles(JournalStore(str(path))) == ["A", "C"]
+
+
+def test_journal_index_replays_only_the_tail(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    store = JournalStore(str(path), compact_min=1000)
+    store.put_many([movie("a", "A", synopsis="aaa"), movie("b", "B")])
+    store.close()
+    index_path = tmp_path / "movies.jsonl.idx"
+    data = json.loads(index_path.read_text(encoding="utf-8"))
+    assert [row[0] for row in data["movies"]] == ["a", "b"]
+
+    # 启动时摘要取自索引，不再解析索引覆盖范围内的日志行
+    data["movies"][0][2] = "来自索引"
+    index_path.write_text(json.dumps(data), encoding="utf-8")
+    reopened = JournalStore(str(path), compact_min=1000)
+    assert titles(reopened) == ["来自索引", "B"]
+
+    # 索引之后追加的行（未正常关闭）仍会重放
+    reopened.put_many([movie("c", "C")])
+    reopened.delete_many(["b"])
+    reopened = JournalStore(str(path), compact_min=1000)
+    assert titles(reopened) == ["来自索引", "C"]
+    assert reopened.load_details("a")["synopsis"] == "aaa"
+    assert reopened._entries == 4
+
+
+def test_journal_ignores_index_of_another_log(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    store = JournalStore(str(path))
+    store.put_many([movie("a", "A"), movie("b", "B")])
+    store.close()
+
+    # 日志被替换（例如从备份恢复）后，旧索引与日志内容不符，完整重放
+    other = JournalStore(str(tmp_path / "other.jsonl"))
+    other.put_many([movie("x", "X"), movie("y", "Y"), movie("z", "Z")])
+    path.write_bytes((tmp_path / "other.jsonl").read_bytes())
+    assert titles(JournalStore(str(path))) == ["X", "Y", "Z"]
+
+    (tmp_path / "movies.jsonl.idx").write_text("{损坏", encoding="utf-8")
+    assert titles(JournalStore(str(path))) == ["X", "Y", "Z"]
+
+
+def test_journal_compaction_rewrites_offsets(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    store = JournalStore(str(path), compact_ratio=1.5, compact_min=4)
+    store.put_many([movie(str(i), f"电影{i}", synopsis=f"简介{i}") for i in range(3)])
+    for round_ in range(5):
+        store.put_many([movie("1", f"电影1-{round_}", synopsis=f"简介1-{round_}")])
+
+    assert len(path.read_bytes().splitlines()) < 8  # 日志膨胀后已自动压缩
+    store.compact()
+    data = path.read_bytes()
+    assert b"\r" not in data
+    assert len(data.splitlines()) == 3  # 只含当前记录的快照
+    assert store.load_details("1")["synopsis"] == "简介1-4"
+    assert store.load_details("2")["synopsis"] == "简介2"
+    assert store.search_details("synopsis", "简介1-4") == {"1"}
+
+    # 详情未加载的记录只更新摘要，详情从压缩后的偏移量读取
+    record = next(r for r in store.iter_summaries() if r.id == "2")
+    record.level = "5"
+    store.put_many([record])
+    reopened = JournalStore(str(path))
+    assert reopened.load_details("2")["synopsis"] == "简介2"
+    assert [r.level for r in reopened.iter_summaries() if r.id == "2"] == ["5"]
+
+
+def test_sqlite_summary_update_keeps_details(tmp_path):
+    store = SQLiteStore(str(tmp_path / "movies.db"))
+    store.put_many([movie("a", "A", synopsis="保留")])
+    record = MovieRecord("a", "A", level="4")
+    store.put_many([record])
+    assert store.load_details("a")["synopsis"] == "保留"
+    assert [r.level for r in store.iter_summaries()] == ["4"]
+    store.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal"])
+def test_migration_runs_once(tmp_path, backend):
+    legacy = tmp_path / "movies.json"
+    legacy.write_text(json.dumps([{"title": "旧1"}, {"title": "旧2"}]), encoding="utf-8")
+    data_path = str(tmp_path / f"movies.{backend}")
+
+    store = open_store(backend, data_path, str(legacy))
+    assert titles(store) == ["旧1", "旧2"]
+    assert not store.first_run
+    assert not legacy.exists()
+    store.delete_many([r.id for r in store.iter_summaries()])
+    store.close()
+
+    reopened = open_store(backend, data_path, str(legacy))
+    assert titles(reopened) == []
+    assert not reopened.first_run
+    reopened.close()
+
+
+def test_first_run_only_for_new_store(tmp_path):
+    store = open_store("sqlite", str(tmp_path / "movies.db"), str(tmp_path / "movies.json"))
+    assert store.first_run
+    store.close()
+    store = open_store("sqlite", str(tmp_path / "movies.db"), str(tmp_path / "movies.json"))
+    assert not store.first_run
+    store.close()
+
+
+class FakeRoot:
+    """只记录 after 回调，由测试手动触发"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._next = 0
+
+    def after(self, delay, callback):
+        self._next += 1
+        self.jobs[self._next] = callback
+        return self._next
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+
+class RecordingStore:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.puts = []
+        self.deletes = []
+
+    def put_many(self, movies):
+        if self.fail:
+            raise OSError("磁盘已满")
+        self.puts.append([dict(m) for m in movies])
+
+    def delete_many(self, movie_ids):
+        self.deletes.append(sorted(movie_ids))
+
+
+def test_batch_writer_coalesces_changes():
+    root, store = FakeRoot(), RecordingStore()
+    writer = BatchWriter(root, store)
+    writer.put(movie("a", "A", level="1"))
+    writer.put(movie("a", "A", level="3"))
+    writer.put(movie("b", "B"))
+    writer.delete(movie("b", "B"))
+    assert len(root.jobs) == 1
+
+    root.run_pending()
+    assert store.puts == [[movie("a", "A", level="3")]]
+    assert store.deletes == [["b"]]
+
+
+def test_batch_writer_flush_cancels_timer_and_keeps_failed_changes():
+    root, store = FakeRoot(), RecordingStore(fail=True)
+    errors = []
+    writer = BatchWriter(root, store, on_error=errors.append)
+    writer.put(movie("a", "A"))
+    assert not writer.flush()
+    assert not root.jobs
+    assert len(errors) == 1
+
+    store.fail = False
+    assert writer.flush()
+    assert store.puts == [[movie("a", "A")]]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal"])
+def test_search_details_from_another_thread(tmp_path, backend):
+    store = open_store(backend, str(tmp_path / f"movies.{backend}"), legacy_path=str(tmp_path / "none.json"))
+    store.put_many([movie(str(i), f"电影{i}", synopsis=f"简介{i}") for i in range(3)])
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(store.search_details, "synopsis", "简介2").result() == {"2"}
+    store.close()